@@ -0,0 +1,61 @@
+"""
+Сериализация через values(): строки приходят из базы словарями,
+модели не создаются. Набор полей выбирается параметром ?fields=.
+"""
+from django.core.files.storage import default_storage
+
+# Имя поля в ответе -> путь в ORM
+POST_FIELDS = {
+    'id': 'pk',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'thumbnail': 'thumbnail_url',
+    'comments_count': 'comments_count',
+}
+COMMENT_FIELDS = {
+    'id': 'pk',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+# Значения, которые надо преобразовать после выборки
+CONVERTERS = {
+    'image': lambda name: default_storage.url(name) if name else None,
+    'thumbnail': lambda url: url or None,
+}
+
+
+class FieldsError(ValueError):
+    pass
+
+
+def select_fields(request, available):
+    """Поля из ?fields=a,b в порядке запроса, по умолчанию все."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return dict(available)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown or not names:
+        raise FieldsError(
+            f'Неизвестные поля: {", ".join(unknown)}. '
+            f'Доступны: {", ".join(available)}'
+        )
+    return {name: available[name] for name in names}
+
+
+def serialize(rows, fields):
+    """Строки values() с путями ORM -> словари с именами полей ответа."""
+    converters = [
+        (name, path, CONVERTERS.get(name)) for name, path in fields.items()
+    ]
+    return [
+        {
+            name: convert(row[path]) if convert else row[path]
+            for name, path, convert in converters
+        }
+        for row in rows
+    ]
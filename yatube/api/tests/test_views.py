@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='...')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {number}', author=cls.author,
+                                group=cls.group if number % 2 else None)
+            for number in range(5)
+        ]
+        Comment.objects.create(post=cls.posts[0], author=cls.reader,
+                               text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def pages(self, url, **params):
+        """Все страницы ленты по курсорам next."""
+        ids, cursor = [], None
+        while True:
+            if cursor:
+                params['cursor'] = cursor
+            data = self.reader_client.get(url, params).json()
+            ids.extend(row['id'] for row in data['results'])
+            cursor = data['next']
+            if cursor is None:
+                return ids
+
+    def test_feeds(self):
+        """Ленты совпадают с HTML-версией и листаются курсором"""
+        newest_first = [post.pk for post in reversed(self.posts)]
+        cases = {
+            reverse('api:index'): newest_first,
+            reverse('api:group_list', kwargs={'slug': 'group'}):
+                [pk for pk in newest_first if pk in
+                 (self.posts[1].pk, self.posts[3].pk)],
+            reverse('api:profile', kwargs={'username': 'author'}):
+                newest_first,
+            reverse('api:follow_index'): newest_first,
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.pages(url, limit=2), expected)
+
+    def test_fields(self):
+        """?fields= выбирает поля ответа"""
+        response = self.client.get(reverse('api:index'),
+                                   {'fields': 'author,id', 'limit': 1})
+        self.assertEqual(response.json()['results'],
+                         [{'author': 'author', 'id': self.posts[-1].pk}])
+        response = self.client.get(reverse('api:index'),
+                                   {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['error'])
+
+    def test_post_detail(self):
+        """Пост отдаётся вместе с комментариями"""
+        url = reverse('api:post_detail',
+                      kwargs={'post_id': self.posts[0].pk})
+        data = self.client.get(url).json()
+        self.assertEqual((data['text'], data['author'], data['group']),
+                         ('Пост 0', 'author', None))
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']['results']],
+            ['Комментарий']
+        )
+        data = self.client.get(url, {'fields': 'id'}).json()
+        self.assertEqual(data, {'id': self.posts[0].pk})
+
+    def test_errors(self):
+        """Ошибки отдаются в JSON с кодом ответа"""
+        cases = {
+            reverse('api:group_list', kwargs={'slug': 'missing'}): 404,
+            reverse('api:profile', kwargs={'username': 'missing'}): 404,
+            reverse('api:post_detail', kwargs={'post_id': 999}): 404,
+            reverse('api:follow_index'): 401,
+            reverse('api:index') + '?cursor=broken': 400,
+            reverse('api:index') + '?limit=many': 400,
+        }
+        for url, status in cases.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('error', response.json())
+
+    def test_not_modified(self):
+        """Повторный запрос с ETag получает 304"""
+        url = reverse('api:index')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_comment_resets_feed_etag(self):
+        """Новый комментарий меняет comments_count, ленты не отдают 304"""
+        urls = (
+            reverse('api:index'),
+            reverse('api:group_list', args=[self.group.slug]),
+            reverse('api:profile', args=[self.author.username]),
+        )
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        Comment.objects.create(post=self.posts[1], author=self.reader,
+                               text='Ещё комментарий')
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url,
+                                           HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, 200)
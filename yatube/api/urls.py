@@ -0,0 +1,18 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.PostList.as_view(), name='index'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/', views.CommentList.as_view(),
+         name='comments'),
+    path('groups/<slug:slug>/posts/', views.GroupPostList.as_view(),
+         name='group_list'),
+    path('profiles/<str:username>/posts/',
+         views.ProfilePostList.as_view(), name='profile'),
+    path('follow/posts/', views.FollowPostList.as_view(),
+         name='follow_index'),
+]
@@ -0,0 +1,154 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+
+from posts import conditional, timeline
+from posts.models import Comment, Follow, Post
+from posts.utils import CursorPaginator, InvalidCursor
+
+from .serializers import (COMMENT_FIELDS, POST_FIELDS, FieldsError,
+                          select_fields, serialize)
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def json_errors(view):
+    """Ошибки запроса отдаются в JSON, а не HTML-страницей."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except FieldsError as fields_error:
+            return JsonResponse({'error': str(fields_error)}, status=400)
+        except ApiError as api_error:
+            return JsonResponse({'error': str(api_error)},
+                                status=api_error.status)
+    return wrapper
+
+
+def get_limit(request, default):
+    try:
+        limit = int(request.GET.get('limit', default))
+    except ValueError:
+        raise ApiError('limit должен быть числом')
+    return min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def values_page(queryset, fields, limit, cursor=None):
+    """
+    Страница строк values() по курсору. Поля ключа сортировки
+    добавляются в выборку и нужны только пагинатору.
+    """
+    ordering = CursorPaginator.get_ordering(queryset)
+    paginator = CursorPaginator(
+        queryset.values(*fields.values(),
+                        *(key.lstrip('-') for key in ordering)),
+        limit
+    )
+    try:
+        page = paginator.page(cursor)
+    except InvalidCursor:
+        raise ApiError('Неверный курсор')
+    return {
+        'results': serialize(page.object_list, fields),
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+@method_decorator(json_errors, name='dispatch')
+class FeedView(View):
+    """Лента в JSON: ?cursor=, ?limit= и ?fields=."""
+    available_fields = POST_FIELDS
+    page_size = settings.POST_PER_PAGE
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get(self, request, **kwargs):
+        fields = select_fields(request, self.available_fields)
+        return JsonResponse(values_page(
+            self.get_queryset(), fields,
+            get_limit(request, self.page_size), request.GET.get('cursor')
+        ))
+
+
+@method_decorator(conditional.api_index, name='dispatch')
+class PostList(FeedView):
+    def get_queryset(self):
+        return Post.objects.all()
+
+
+@method_decorator(conditional.api_group, name='dispatch')
+class GroupPostList(FeedView):
+    def get_queryset(self):
+        # Строка уже выбрана для ETag, повторного запроса нет
+        row = conditional.group_row(self.request, self.kwargs['slug'])
+        if row is None:
+            raise ApiError('Группа не найдена', 404)
+        return Post.objects.filter(group_id=row[0])
+
+
+@method_decorator(conditional.api_profile, name='dispatch')
+class ProfilePostList(FeedView):
+    def get_queryset(self):
+        row = conditional.author_row(self.request, self.kwargs['username'])
+        if row is None:
+            raise ApiError('Автор не найден', 404)
+        return Post.objects.filter(author_id=row[0])
+
+
+class FollowPostList(FeedView):
+    def get_queryset(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            raise ApiError('Нужна авторизация', 401)
+        if timeline.is_enabled():
+            return timeline.feed_queryset(user, cursor=True)
+        return Post.objects.filter(
+            author__in=Follow.objects.filter(user=user).values('author')
+        )
+
+
+@method_decorator(conditional.post, name='dispatch')
+class CommentList(FeedView):
+    available_fields = COMMENT_FIELDS
+    page_size = settings.COMMENTS_PER_PAGE
+
+    def get_queryset(self):
+        post_id = self.kwargs['post_id']
+        if conditional.post_row(self.request, post_id) is None:
+            raise ApiError('Пост не найден', 404)
+        return Comment.objects.filter(post_id=post_id)
+
+
+@conditional.post
+@json_errors
+def post_detail(request, post_id):
+    """
+    Пост с первой страницей комментариев, следующие страницы
+    отдаёт CommentList по курсору comments['next'].
+    """
+    if conditional.post_row(request, post_id) is None:
+        raise ApiError('Пост не найден', 404)
+    fields = select_fields(request, {**POST_FIELDS, 'comments': None})
+    with_comments = fields.pop('comments', False) is None
+    data = {}
+    if fields:
+        data = serialize(
+            Post.objects.filter(pk=post_id).values(*fields.values()),
+            fields
+        )[0]
+    if with_comments:
+        data['comments'] = values_page(
+            Comment.objects.filter(post_id=post_id), COMMENT_FIELDS,
+            settings.COMMENTS_PER_PAGE
+        )
+    return JsonResponse(data)
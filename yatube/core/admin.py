@@ -0,0 +1,21 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'run_at', 'attempts', 'failed',
+                    'last_error')
+    list_filter = ('failed', 'name')
+    # Аргументы задач могут содержать личные данные пользователей
+    exclude = ('payload',)
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        queryset.update(failed=False, attempts=0, run_at=timezone.now(),
+                        locked_by='', locked_until=None)
+    retry.short_description = 'Повторить выбранные задачи'
+
+
+admin.site.register(Task, TaskAdmin)
@@ -0,0 +1,257 @@
+"""
+Бюджеты запросов и времени ответа для всех страниц posts, users, about
+и JSON API.
+
+Набор данных засевается (core.seeding) в отдельную тестовую базу,
+каждая страница запрашивается несколько раз с холодным кэшем, а результат
+сохраняется в JSON, чтобы сравнивать отчёты разных коммитов.
+"""
+import statistics
+import threading
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import OperationalError, connection
+from django.template.loader import get_template
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+NAMESPACES = ('posts', 'users', 'about', 'api')
+
+# Максимум SQL-запросов и миллисекунд (медиана) на страницу
+DEFAULT_BUDGET = {'queries': 3, 'ms': 250}
+# Ленты групп и авторов и страница поста делают один запрос на ETag
+BUDGETS = {
+    'posts:index': {'queries': 4},
+    'posts:group_list': {'queries': 6},
+    'posts:profile': {'queries': 7},
+    'posts:post_detail': {'queries': 5},
+    'posts:comments': {'queries': 4},
+    'posts:post_edit': {'queries': 5},
+    'posts:follow_index': {'queries': 5},
+    'posts:profile_follow': {'queries': 4},
+    'posts:profile_unfollow': {'queries': 7},
+    'posts:post_delete': {'queries': 10},
+    'users:logout': {'queries': 4},
+    'api:index': {'queries': 3},
+    'api:group_list': {'queries': 4},
+    'api:profile': {'queries': 4},
+    'api:post_detail': {'queries': 5},
+    'api:comments': {'queries': 4},
+    'api:follow_index': {'queries': 4},
+}
+# JSON API и HTML-страница с теми же данными
+API_EQUIVALENTS = {
+    'api:index': 'posts:index',
+    'api:group_list': 'posts:group_list',
+    'api:profile': 'posts:profile',
+    'api:post_detail': 'posts:post_detail',
+    'api:follow_index': 'posts:follow_index',
+}
+
+# Шаблоны лент, в которых измеряется стоимость одной карточки поста
+LISTING_TEMPLATES = ('posts/index.html', 'posts/group_list.html',
+                     'posts/profile.html', 'posts/follow.html')
+
+
+# Управление транзакциями не считается: в TestCase atomic() даёт
+# SAVEPOINT, а в autocommit команды benchmark - BEGIN и COMMIT
+TRANSACTION_SQL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT',
+                   'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+def data_queries(captured):
+    return [query for query in captured
+            if not query['sql'].upper().startswith(TRANSACTION_SQL)]
+
+
+def budget_for(view_name):
+    return {**DEFAULT_BUDGET, **BUDGETS.get(view_name, {})}
+
+
+class Benchmark:
+    def __init__(self, repeat=3, warm=False, capture_sql=False):
+        self.repeat = repeat
+        self.warm = warm
+        self.capture_sql = capture_sql
+        follow = Follow.objects.select_related('user', 'author').first()
+        self.user = follow.user
+        self.author = follow.author
+        self.post = (
+            Post.objects.filter(author=self.user).first()
+            or Post.objects.create(text='Пост', author=self.user)
+        )
+        self.group = Group.objects.first()
+        # Адрес не из INTERNAL_IPS, чтобы не включался debug_toolbar
+        self.client = Client(REMOTE_ADDR='10.0.0.1')
+
+    def routes(self):
+        for namespace in NAMESPACES:
+            for pattern in import_module(f'{namespace}.urls').urlpatterns:
+                if isinstance(pattern, URLPattern) and pattern.name:
+                    yield (f'{namespace}:{pattern.name}',
+                           list(pattern.pattern.converters))
+
+    def kwargs_for(self, view_name, params):
+        values = {
+            'slug': self.group.slug,
+            'username': self.author.username,
+            'post_id': self.post.pk,
+            'uidb64': 'MQ',
+            'token': 'set-password',
+            'kind': 'posts',
+        }
+        if view_name == 'posts:post_delete':
+            values['post_id'] = Post.objects.create(
+                text='Пост для удаления', author=self.user
+            ).pk
+        if view_name == 'posts:profile_unfollow':
+            Follow.objects.get_or_create(user=self.user, author=self.author)
+        return {param: values[param] for param in params}
+
+    def measure(self, view_name, params):
+        timings, queries, status, url = [], 0, None, None
+        for _ in range(self.repeat):
+            url = reverse(view_name, kwargs=self.kwargs_for(view_name,
+                                                            params))
+            self.client.force_login(self.user)
+            if not self.warm:
+                for alias in settings.CACHES:
+                    caches[alias].clear()
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = self.client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            sql = data_queries(captured)
+            queries = max(queries, len(sql))
+            status = response.status_code
+        budget = budget_for(view_name)
+        ms = statistics.median(timings)
+        row = {
+            'view': view_name,
+            'url': url,
+            'status': status,
+            'queries': queries,
+            'ms': round(ms, 2),
+            'ms_max': round(max(timings), 2),
+            'budget': budget,
+            'ok': queries <= budget['queries'] and ms <= budget['ms'],
+        }
+        if self.capture_sql:
+            row['sql'] = [query['sql'] for query in sql]
+        return row
+
+    def run(self):
+        return [self.measure(name, params) for name, params in self.routes()]
+
+    def render_listing(self, template, posts):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        context = {
+            'page_obj': posts,
+            'group': self.group,
+            'author': self.author,
+            'listing_version': '',
+        }
+        for post in posts:
+            post.card_version = ''
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        start = time.perf_counter()
+        get_template(template).render(context, request)
+        return time.perf_counter() - start
+
+    def row_render_cost(self, rows=None, repeat=20):
+        """
+        Миллисекунды рендера одной карточки поста в каждой ленте:
+        разница между страницами из 2N и N постов, делённая на N.
+        Разбор шаблона и общие части страницы при вычитании сокращаются.
+        """
+        rows = rows or settings.POST_PER_PAGE
+        posts = list(Post.objects.for_listing()[:rows * 2])
+        rows = len(posts) // 2
+        cost = {}
+        for template in LISTING_TEMPLATES:
+            timings = [
+                self.render_listing(template, posts)
+                - self.render_listing(template, posts[:rows])
+                for _ in range(repeat)
+            ]
+            cost[template] = round(
+                statistics.median(timings) * 1000 / max(rows, 1), 3
+            )
+        return cost
+
+
+def compare(results, baseline):
+    """Разница с предыдущим отчётом: (view, было, стало) по запросам и мс."""
+    previous = {row['view']: row for row in baseline['results']}
+    for row in results:
+        old = previous.get(row['view'])
+        if old is not None:
+            yield (row['view'], old['queries'], row['queries'],
+                   old['ms'], row['ms'])
+
+
+def compare_render_cost(render_cost, baseline):
+    """Стоимость карточки по шаблонам: (шаблон, было, стало) в мс."""
+    previous = baseline.get('render_cost', {})
+    for template, ms in render_cost.items():
+        if template in previous:
+            yield template, previous[template], ms
+
+
+def api_speedups(results):
+    """Во сколько раз JSON API отвечает быстрее HTML-страницы."""
+    ms = {row['view']: row['ms'] for row in results}
+    for api_view, html_view in API_EQUIVALENTS.items():
+        if api_view in ms and html_view in ms:
+            yield api_view, html_view, ms[html_view] / max(ms[api_view],
+                                                           0.01)
+
+
+def concurrent_comments(writers=8, comments=100):
+    """
+    Пишет комментарии из нескольких потоков, у каждого своё соединение.
+    Возвращает число записанных комментариев, время и ошибки блокировки.
+    """
+    post = Post.objects.order_by('pk').first()
+    authors = list(User.objects.order_by('pk')[:writers])
+    before = Comment.objects.count()
+    errors = []
+    barrier = threading.Barrier(writers)
+
+    def commenter(author):
+        try:
+            barrier.wait()
+            for number in range(comments):
+                try:
+                    Comment.objects.create(post=post, author=author,
+                                           text=f'Комментарий {number}')
+                except OperationalError as error:
+                    errors.append(str(error))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=commenter, args=(author,))
+               for author in authors]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    written = Comment.objects.count() - before
+    return {
+        'writers': len(authors),
+        'written': written,
+        'errors': len(errors),
+        'seconds': round(seconds, 3),
+        'per_second': round(written / seconds, 1),
+    }
@@ -0,0 +1,88 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from yatube.db_router import pinned_to_primary
+
+from . import metrics
+
+VERSION_KEY = 'version:{}'
+
+
+def get_cache():
+    return caches[settings.FRAGMENT_CACHE_ALIAS]
+
+
+def get_version(namespace):
+    """Текущая версия пространства ключей; создаётся при первом обращении."""
+    cache = get_cache()
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(namespaces):
+    """Версии нескольких пространств за одно обращение к кэшу."""
+    cache = get_cache()
+    keys = {VERSION_KEY.format(namespace): namespace
+            for namespace in namespaces}
+    found = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, None)
+        found.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_version(*namespaces):
+    """Инвалидирует все фрагменты пространств, не удаляя их из кэша."""
+    get_cache().set_many(
+        {VERSION_KEY.format(namespace): uuid.uuid4().hex
+         for namespace in namespaces},
+        None
+    )
+
+
+def get_or_render(key, version, timeout, render):
+    """
+    Возвращает фрагмент из кэша или рендерит его заново.
+
+    Устаревший фрагмент (истёк срок или сменилась версия) пересчитывает
+    только один запрос, захвативший блокировку; остальные в это время
+    получают устаревшее содержимое. Запросы, закреплённые за основной
+    базой после записи, всегда рендерят фрагмент сами.
+    """
+    cache = get_cache()
+    entry = cache.get(key)
+    now = time.time()
+    # Сессия, которая только что писала, не должна получить фрагмент,
+    # отрендеренный по отстающей реплике: она рендерит его заново
+    pinned = pinned_to_primary()
+    if (entry and not pinned and entry['version'] == version
+            and entry['expires'] > now):
+        metrics.record_cache(hit=True)
+        return entry['content']
+    lock_key = f'{key}:lock'
+    locked = cache.add(lock_key, 1, settings.FRAGMENT_LOCK_TIMEOUT)
+    if not locked and entry and not pinned:
+        metrics.record_cache(hit=True)
+        return entry['content']
+    metrics.record_cache(hit=False)
+    try:
+        content = render()
+        cache.set(
+            key,
+            {'version': version, 'expires': now + timeout,
+             'content': content},
+            timeout + settings.FRAGMENT_STALE_TIMEOUT
+        )
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return content
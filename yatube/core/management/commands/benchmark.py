@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from core import benchmark, seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Засевает тестовую базу и проверяет бюджеты SQL-запросов '
+        'и времени ответа для всех страниц'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--warm', action='store_true',
+                            help='Не сбрасывать кэш перед запросами')
+        parser.add_argument('--output', help='Файл для JSON-отчёта')
+        parser.add_argument('--compare',
+                            help='JSON-отчёт предыдущего запуска')
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        old_config = setup_databases(verbosity=verbosity - 1,
+                                     interactive=False,
+                                     aliases=['default'])
+        try:
+            dataset = {key: options[key]
+                       for key in ('users', 'posts', 'comments', 'follows')}
+            seeding.seed(**dataset)
+            bench = benchmark.Benchmark(repeat=options['repeat'],
+                                        warm=options['warm'])
+            results = bench.run()
+            render_cost = bench.row_render_cost()
+        finally:
+            teardown_databases(old_config, verbosity=verbosity - 1)
+
+        for row in results:
+            style = self.style.SUCCESS if row['ok'] else self.style.ERROR
+            self.stdout.write(style(
+                f"{row['view']:<32} {row['status']} "
+                f"{row['queries']:>3}/{row['budget']['queries']} запросов "
+                f"{row['ms']:>8.2f}/{row['budget']['ms']} мс"
+            ))
+        for api_view, html_view, speedup in benchmark.api_speedups(results):
+            self.stdout.write(f'{api_view:<32} быстрее {html_view} '
+                              f'в {speedup:.1f} раза')
+        for template, ms in render_cost.items():
+            self.stdout.write(f'Карточка поста в {template:<22} '
+                              f'{ms:.3f} мс')
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+            for view, old_q, new_q, old_ms, new_ms in benchmark.compare(
+                    results, baseline):
+                self.stdout.write(
+                    f'{view:<32} запросов {old_q} -> {new_q}, '
+                    f'мс {old_ms} -> {new_ms}'
+                )
+            for template, old_ms, new_ms in benchmark.compare_render_cost(
+                    render_cost, baseline):
+                self.stdout.write(f'Карточка поста в {template:<22} '
+                                  f'мс {old_ms} -> {new_ms}')
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump({'dataset': dataset, 'results': results,
+                           'render_cost': render_cost},
+                          file, ensure_ascii=False, indent=2)
+        failed = [row['view'] for row in results if not row['ok']]
+        if failed:
+            raise CommandError(f'Превышен бюджет: {", ".join(failed)}')
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (override_settings, setup_databases,
+                               teardown_databases)
+
+from core import benchmark, seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Пропускная способность записи комментариев из N параллельных '
+        'потоков во временный файл SQLite с настройками и без них'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, nargs='+',
+                            default=[1, 4, 8])
+        parser.add_argument('--comments', type=int, default=200,
+                            help='Комментариев на каждый поток')
+        parser.add_argument('--no-tuning', action='store_true',
+                            help='Не применять SQLITE_PRAGMAS')
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        directory = tempfile.mkdtemp()
+        # Параллельная запись проверяется на файле, а не в памяти
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory, 'benchmark.sqlite3'
+        )
+        pragmas = override_settings(SQLITE_PRAGMAS={})
+        if options['no_tuning']:
+            pragmas.enable()
+        old_config = setup_databases(verbosity=verbosity - 1,
+                                     interactive=False,
+                                     aliases=['default'])
+        try:
+            seeding.seed(users=max(options['writers']), posts=1,
+                         comments=0, follows=0, groups=1)
+            for writers in options['writers']:
+                result = benchmark.concurrent_comments(writers,
+                                                       options['comments'])
+                style = (self.style.ERROR if result['errors']
+                         else self.style.SUCCESS)
+                self.stdout.write(style(
+                    f"{result['writers']:>3} потоков: "
+                    f"{result['written']} комментариев за "
+                    f"{result['seconds']} с, {result['per_second']}/с, "
+                    f"ошибок блокировки {result['errors']}"
+                ))
+        finally:
+            teardown_databases(old_config, verbosity=verbosity - 1)
+            if options['no_tuning']:
+                pragmas.disable()
+            shutil.rmtree(directory, ignore_errors=True)
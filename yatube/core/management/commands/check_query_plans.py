@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from core import benchmark, query_plans, seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN QUERY PLAN для запросов всех страниц и падает '
+        'на полном сканировании таблиц и сортировке во временном B-дереве'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=2000)
+        parser.add_argument('--follows', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Проверка планов поддерживает только SQLite')
+        verbosity = options['verbosity']
+        old_config = setup_databases(verbosity=verbosity - 1,
+                                     interactive=False,
+                                     aliases=['default'])
+        try:
+            seeding.seed(**{
+                key: options[key]
+                for key in ('users', 'posts', 'comments', 'follows')
+            })
+            results = benchmark.Benchmark(repeat=1,
+                                          capture_sql=True).run()
+            failures = list(query_plans.check(results))
+        finally:
+            teardown_databases(old_config, verbosity=verbosity - 1)
+
+        for view, sql, found in failures:
+            self.stdout.write(self.style.ERROR(view))
+            self.stdout.write(f'  {sql}')
+            for detail in found:
+                self.stdout.write(f'  -> {detail}')
+        if failures:
+            views = sorted({view for view, _, _ in failures})
+            raise CommandError(
+                f'Неэффективные планы запросов: {", ".join(views)}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Планы запросов {len(results)} страниц в порядке'
+        ))
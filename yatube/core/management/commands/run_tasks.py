@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    help = 'Воркер фоновой очереди задач (core.tasks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Выйти, когда готовых задач не останется')
+        parser.add_argument('--batch-size', type=int,
+                            default=settings.TASK_BATCH_SIZE)
+        parser.add_argument('--sleep', type=float,
+                            default=settings.TASK_POLL_INTERVAL,
+                            help='Пауза между опросами пустой очереди, с')
+
+    def handle(self, *args, **options):
+        worker = tasks.Worker(batch_size=options['batch_size'],
+                              log=self.stdout.write)
+        try:
+            worker.run(once=options['once'], sleep=options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {worker.done}, с ошибкой: {worker.failed}'
+        ))
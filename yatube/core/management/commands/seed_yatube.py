@@ -0,0 +1,43 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from core import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу пользователями, постами, подписками и '
+        'комментариями для нагрузочных тестов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--follows', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--images', type=int, default=0,
+                            help='Сколько постов получат картинки')
+        parser.add_argument('--alpha', type=float, default=1.1,
+                            help='Показатель степенного закона популярности')
+        parser.add_argument('--batch-size', type=int,
+                            default=seeding.BATCH_SIZE)
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Зерно генератора случайных чисел')
+
+    def handle(self, *args, **options):
+        seeder = seeding.Seeder(
+            rng=random.Random(options['seed']),
+            alpha=options['alpha'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        seeder.run(**{
+            key: options[key]
+            for key in ('users', 'groups', 'posts', 'follows', 'comments',
+                        'images')
+        })
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, пароль пользователей: {seeding.PASSWORD}'
+        ))
@@ -0,0 +1,86 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import startup
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет холодный старт WSGI-воркера: время импорта модулей '
+        '(-X importtime) и время до первого ответа'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/',
+                            help='Адрес первого запроса')
+        parser.add_argument('--env', action='append', default=[],
+                            metavar='NAME=VALUE',
+                            help='Переменная окружения воркера, например '
+                                 'YATUBE_ENV=production')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument('--output', help='Файл для JSON-отчёта')
+        parser.add_argument('--compare',
+                            help='JSON-отчёт предыдущего запуска')
+        parser.add_argument('--max-boot-ms', type=float,
+                            help='Падать, если старт с первым запросом '
+                                 'дольше')
+
+    @staticmethod
+    def parse_env(items):
+        env = {}
+        for item in items:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Ожидается NAME=VALUE: {item}')
+            env[name] = value
+        return env
+
+    def handle(self, *args, **options):
+        env = self.parse_env(options['env'])
+        try:
+            reports = [startup.run_probe(options['path'], env)
+                       for _ in range(max(options['repeat'], 1))]
+        except RuntimeError as error:
+            raise CommandError(f'Воркер не запустился: {error}')
+        summary = startup.summarize(reports, options['top'])
+        imports = reports[-1]['imports']
+
+        self.stdout.write(
+            f"Импорт yatube.wsgi: {summary['wsgi_ms']} мс "
+            f"(модулей {summary['modules']}, "
+            f"собственное время импорта {summary['import_ms']} мс)"
+        )
+        self.stdout.write(
+            f"Первый запрос {options['path']}: "
+            f"{summary['first_request_ms']} мс, {summary['status']}"
+        )
+        self.stdout.write('Пакеты по времени импорта:')
+        for package, ms in summary['packages'].items():
+            self.stdout.write(f'  {package:<24} {ms:>8.1f} мс')
+        self.stdout.write('Модули по времени импорта с зависимостями:')
+        for item in sorted(imports, key=lambda item: -item.cumulative_us)[
+                :options['top']]:
+            self.stdout.write(f'  {item.module:<48} '
+                              f'{item.cumulative_us / 1000:>8.1f} мс')
+
+        for hint in summary['hints']:
+            self.stdout.write(self.style.WARNING(hint))
+
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+            for key in ('wsgi_ms', 'first_request_ms', 'boot_ms'):
+                self.stdout.write(f'{key}: {baseline[key]} -> {summary[key]}')
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(summary, file, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Старт воркера с первым запросом: {summary['boot_ms']} мс"
+        ))
+        budget = options['max_boot_ms']
+        if budget is not None and summary['boot_ms'] > budget:
+            raise CommandError(
+                f"Старт {summary['boot_ms']} мс дольше {budget} мс"
+            )
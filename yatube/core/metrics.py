@@ -0,0 +1,137 @@
+"""
+Лёгкие метрики запросов: время ответа, число и время SQL-запросов,
+время рендеринга шаблонов и попадания в кэш фрагментов.
+
+Замеры текущего запроса копятся в contextvar, а после ответа
+складываются в ограниченные очереди по имени view. Агрегаты живут
+в памяти процесса.
+"""
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+
+FIELDS = ('total_ms', 'queries', 'sql_ms', 'template_ms',
+          'cache_hits', 'cache_misses', 'authenticated')
+CACHE_HITS, CACHE_MISSES, AUTHENTICATED = (
+    FIELDS.index(field)
+    for field in ('cache_hits', 'cache_misses', 'authenticated')
+)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+_samples = defaultdict(
+    lambda: deque(maxlen=settings.PERFORMANCE_METRICS_SAMPLES)
+)
+_lock = threading.Lock()
+
+
+class RequestMetrics:
+    __slots__ = ('start', 'queries', 'sql', 'template', 'cache_hits',
+                 'cache_misses')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - start
+            self.queries += 1
+
+    def as_sample(self, authenticated=False):
+        return (
+            (time.perf_counter() - self.start) * 1000,
+            self.queries,
+            self.sql * 1000,
+            self.template * 1000,
+            self.cache_hits,
+            self.cache_misses,
+            authenticated,
+        )
+
+
+def begin():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def add_template_time(seconds):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.template += seconds
+
+
+def record_cache(hit):
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def store(view_name, sample):
+    with _lock:
+        _samples[view_name].append(sample)
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+
+
+def percentile(values, fraction):
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def hit_rate(rows):
+    hits = sum(row[CACHE_HITS] for row in rows)
+    lookups = hits + sum(row[CACHE_MISSES] for row in rows)
+    return round(hits / lookups, 3) if lookups else None
+
+
+def summary():
+    """Перцентили по каждому view для страницы метрик."""
+    with _lock:
+        snapshot = {name: list(rows) for name, rows in _samples.items()}
+    report = {}
+    for view_name, rows in snapshot.items():
+        if not rows:
+            continue
+        columns = dict(zip(FIELDS, zip(*rows)))
+        report[view_name] = {
+            'count': len(rows),
+            'cache_hit_rate': hit_rate(rows),
+            'cache_hit_rate_by_user': {
+                'authenticated': hit_rate(
+                    [row for row in rows if row[AUTHENTICATED]]
+                ),
+                'anonymous': hit_rate(
+                    [row for row in rows if not row[AUTHENTICATED]]
+                ),
+            },
+            **{
+                field: {
+                    f'p{int(q * 100)}': round(
+                        percentile(sorted(columns[field]), q), 2
+                    )
+                    for q in (0.5, 0.95, 0.99)
+                }
+                for field in ('total_ms', 'queries', 'sql_ms', 'template_ms')
+            },
+        }
+    return report
@@ -0,0 +1,47 @@
+from contextlib import ExitStack
+
+from django.db import connections
+from django.utils.functional import empty
+
+from . import metrics
+
+
+def is_authenticated(request):
+    """Не загружает пользователя, если view к нему не обращалась."""
+    user = getattr(request, 'user', None)
+    if getattr(user, '_wrapped', None) is empty:
+        return False
+    return bool(user and user.is_authenticated)
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Замеряет время ответа, SQL и рендеринг шаблонов для каждого
+    запроса, копит их по имени view и добавляет заголовок Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics, token = metrics.begin()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics.sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.end(token)
+        sample = request_metrics.as_sample(is_authenticated(request))
+        match = getattr(request, 'resolver_match', None)
+        metrics.store(match.view_name if match else 'unresolved', sample)
+        total_ms, queries, sql_ms, template_ms, hits, misses, _ = sample
+        response['Server-Timing'] = (
+            f'total;dur={total_ms:.2f}, '
+            f'sql;dur={sql_ms:.2f};desc="{queries} queries", '
+            f'tpl;dur={template_ms:.2f}, '
+            f'cache;desc="hit={hits} miss={misses}"'
+        )
+        return response
@@ -11,3 +11,31 @@ class CreatedModel(models.Model):
     class Meta:
         # Это абстрактная модель:
         abstract = True
+
+
+class Task(models.Model):
+    """Отложенная задача фоновой очереди, см. core/tasks.py."""
+    name = models.CharField('Задача', max_length=100)
+    payload = models.TextField('Аргументы в JSON', default='{}')
+    run_at = models.DateTimeField('Выполнить после')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    failed = models.BooleanField('Попытки исчерпаны', default=False)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    # Воркер, взявший задачу, и срок, после которого её может взять
+    # другой воркер, если этот упал
+    locked_by = models.CharField(max_length=32, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['failed', 'run_at'],
+                         name='task_due_idx'),
+            models.Index(fields=['locked_by'], name='task_locked_by_idx'),
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
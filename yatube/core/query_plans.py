@@ -0,0 +1,51 @@
+"""
+Проверка планов SQL-запросов страниц через EXPLAIN QUERY PLAN (SQLite).
+
+Запросы собирает core.benchmark.Benchmark, каждый план ищет полное
+сканирование таблицы и сортировку во временном B-дереве: на больших
+объёмах и то и другое растёт линейно с числом постов.
+"""
+import re
+
+from django.db import connection
+
+FULL_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+TEMP_BTREE = 'USE TEMP B-TREE'
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE')
+
+# Маленькие справочники, которые целиком выводятся в формах
+ALLOWED_SCANS = {'posts_group'}
+# Страницы, где сортировка неизбежна: поиск упорядочивает по bm25
+EXEMPT_VIEWS = {'posts:search'}
+
+
+def explain(sql):
+    """Строки плана запроса в порядке вывода SQLite."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def problems(plan, allowed_scans=ALLOWED_SCANS):
+    tables = set(connection.introspection.table_names())
+    for detail in plan:
+        match = FULL_SCAN_RE.match(detail)
+        # SCAN подзапроса или CTE — не таблица
+        if (match and match.group(1) in tables
+                and match.group(1) not in allowed_scans):
+            yield detail
+        elif TEMP_BTREE in detail:
+            yield detail
+
+
+def check(results):
+    """(view, sql, проблемы) для отчёта Benchmark с capture_sql=True."""
+    for row in results:
+        if row['view'] in EXEMPT_VIEWS:
+            continue
+        for sql in row['sql']:
+            if not sql.lstrip().upper().startswith(EXPLAINED):
+                continue
+            found = list(problems(explain(sql)))
+            if found:
+                yield row['view'], sql, found
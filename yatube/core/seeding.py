@@ -0,0 +1,171 @@
+"""
+Генерация больших наборов данных для нагрузочных тестов.
+
+Все строки вставляются пакетами через bulk_create, поэтому сигналы не
+срабатывают: счётчики, поисковый индекс и ленты подписок после вставки
+пересчитываются целиком. Популярность авторов и постов распределена по
+степенному закону, как в настоящих соцсетях: немногие авторы собирают
+большую часть подписчиков и комментариев.
+"""
+import io
+import itertools
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image
+
+from posts import counters, search, timeline
+from posts.models import Comment, Follow, Group, Post, User
+from posts.utils import bulk_create_chunked
+
+BATCH_SIZE = 1000
+PASSWORD = 'yatube-seed'
+
+
+def power_law_weights(count, alpha):
+    """Накопленные веса Ципфа для random.choices: ранг k весит 1/k^alpha."""
+    return list(itertools.accumulate(
+        1 / rank ** alpha for rank in range(1, count + 1)
+    ))
+
+
+def synthetic_image(number, size=(960, 339)):
+    """PNG-градиент: у каждого поста своя картинка."""
+    hue = number * 37 % 256
+    image = Image.linear_gradient('L').resize(size).convert('RGB')
+    image = Image.merge('RGB', (
+        image.getchannel(0).point(lambda value: (value + hue) % 256),
+        image.getchannel(1),
+        image.getchannel(2).point(lambda value: 255 - value),
+    ))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return ContentFile(buffer.getvalue())
+
+
+class Seeder:
+    def __init__(self, rng=None, alpha=1.1, batch_size=BATCH_SIZE,
+                 log=None):
+        self.rng = rng or random.Random(0)
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+
+    def _timed(self, label, create, *args):
+        start = time.perf_counter()
+        # Одна транзакция на этап вместо фиксации каждого пакета
+        with transaction.atomic():
+            count = create(*args)
+        done = f'{count} ' if count is not None else ''
+        self.log(f'{label}: {done}за {time.perf_counter() - start:.1f} с')
+
+    def users(self, count):
+        password = make_password(PASSWORD)
+        offset = User.objects.count()
+        bulk_create_chunked(
+            User,
+            (User(username=f'user{offset + number}', password=password)
+             for number in range(count)),
+            self.batch_size,
+        )
+        return count
+
+    def groups(self, count):
+        offset = Group.objects.count()
+        Group.objects.bulk_create(
+            Group(title=f'Группа {offset + number}',
+                  slug=f'group-{offset + number}', description='...')
+            for number in range(count)
+        )
+        return count
+
+    def ranked(self, ids):
+        """
+        Случайный порядок популярности. Активность и популярность
+        ранжируются независимо: иначе самые читаемые авторы писали бы
+        больше всех и ленты подписок росли бы квадратично.
+        """
+        return self.rng.sample(ids, len(ids))
+
+    def posts(self, count, user_ids, group_ids):
+        weights = power_law_weights(len(user_ids), self.alpha)
+        authors = self.rng.choices(self.ranked(user_ids),
+                                   cum_weights=weights, k=count)
+        groups = group_ids + [None]
+        bulk_create_chunked(
+            Post,
+            (Post(text=f'Пост {number}', author_id=author,
+                  group_id=self.rng.choice(groups))
+             for number, author in enumerate(authors)),
+            self.batch_size,
+        )
+        return count
+
+    def comments(self, count, user_ids, post_ids):
+        weights = power_law_weights(len(post_ids), self.alpha)
+        posts = self.rng.choices(self.ranked(post_ids),
+                                 cum_weights=weights, k=count)
+        bulk_create_chunked(
+            Comment,
+            (Comment(text=f'Комментарий {number}', post_id=post,
+                     author_id=self.rng.choice(user_ids))
+             for number, post in enumerate(posts)),
+            self.batch_size,
+        )
+        return count
+
+    def follows(self, count, user_ids):
+        weights = power_law_weights(len(user_ids), self.alpha)
+        authors = self.rng.choices(self.ranked(user_ids),
+                                   cum_weights=weights, k=count)
+        pairs = {
+            (self.rng.choice(user_ids), author) for author in authors
+        }
+        pairs = [(user, author) for user, author in pairs if user != author]
+        bulk_create_chunked(
+            Follow,
+            (Follow(user_id=user, author_id=author)
+             for user, author in pairs),
+            self.batch_size,
+            ignore_conflicts=True,
+        )
+        return len(pairs)
+
+    def images(self, count, post_ids):
+        for number, post_id in enumerate(post_ids[:count]):
+            name = default_storage.save(f'posts/seed_{post_id}.png',
+                                        synthetic_image(number))
+            Post.objects.filter(pk=post_id).update(image=name)
+        return min(count, len(post_ids))
+
+    def run(self, users=0, groups=0, posts=0, comments=0, follows=0,
+            images=0):
+        self._timed('Пользователи', self.users, users)
+        self._timed('Группы', self.groups, groups)
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        group_ids = list(Group.objects.values_list('pk', flat=True))
+        if user_ids:
+            self._timed('Посты', self.posts, posts, user_ids, group_ids)
+            self._timed('Подписки', self.follows, follows, user_ids)
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        if post_ids:
+            self._timed('Комментарии', self.comments, comments, user_ids,
+                        post_ids)
+            self._timed('Картинки', self.images, images, post_ids)
+        # Пакетные вставки не отправляют сигналов
+        self._timed('Счётчики', counters.recount_all)
+        self._timed('Поисковый индекс', search.get_backend().rebuild)
+        if timeline.is_enabled():
+            self._timed('Ленты подписок', timeline.rebuild)
+
+
+def seed(users=1000, posts=10000, comments=10000, follows=10000,
+         groups=20, images=0, rng=None, log=None):
+    """Быстро заполняет базу пакетными вставками."""
+    Seeder(rng=rng, log=log).run(users=users, groups=groups, posts=posts,
+                                 comments=comments, follows=follows,
+                                 images=images)
@@ -0,0 +1,119 @@
+"""
+Профиль холодного старта WSGI-воркера.
+
+Отдельный интерпретатор с -X importtime импортирует yatube.wsgi и
+обрабатывает первый запрос; время импорта каждого модуля разбирается
+из stderr и суммируется по пакетам верхнего уровня.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+
+# Выполняется в дочернем процессе: время до application и до ответа
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from yatube.wsgi import application
+loaded = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+status = []
+response = application(environ, lambda code, headers, exc_info=None:
+                       status.append(code))
+b''.join(response)
+response.close()
+done = time.perf_counter()
+print(json.dumps({
+    'status': status[0],
+    'wsgi_ms': (loaded - start) * 1000,
+    'first_request_ms': (done - loaded) * 1000,
+}))
+'''
+
+IMPORTTIME_RE = re.compile(
+    r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$'
+)
+
+Import = namedtuple('Import', 'module self_us cumulative_us depth')
+
+# Пакеты, которые не нужны воркеру в продакшене, и как от них избавиться
+HINTS = {
+    'debug_toolbar': 'YATUBE_ENV=production отключает debug_toolbar',
+    'dotenv': 'YATUBE_ENV=production не читает .env',
+    'setuptools': (
+        'SETUPTOOLS_USE_DISTUTILS=stdlib в окружении воркера: Django 2.2 '
+        'импортирует distutils, а замена из setuptools тянет pkg_resources'
+    ),
+}
+
+
+def parse_importtime(text):
+    """Строки вывода -X importtime в порядке завершения импорта."""
+    imports = []
+    for line in text.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(Import(module, int(self_us), int(cumulative_us),
+                                  len(indent) // 2))
+    return imports
+
+
+def by_package(imports):
+    """Собственное время импорта, сложенное по пакетам верхнего уровня."""
+    totals = defaultdict(int)
+    for item in imports:
+        totals[item.module.partition('.')[0]] += item.self_us
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def hints(imports):
+    """Подсказки для пакетов из HINTS, попавших в импорт воркера."""
+    packages = {item.module.partition('.')[0] for item in imports}
+    return [hint for package, hint in HINTS.items() if package in packages]
+
+
+def run_probe(path='/', env=None):
+    """Запускает холодный старт в отдельном процессе и возвращает отчёт."""
+    child_env = {**os.environ, **(env or {})}
+    child_env.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, path],
+        cwd=settings.BASE_DIR, env=child_env, capture_output=True,
+        text=True, check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1]
+                           if result.stderr.strip() else 'probe failed')
+    imports = parse_importtime(result.stderr)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['import_ms'] = sum(item.self_us for item in imports) / 1000
+    report['modules'] = len(imports)
+    report['imports'] = imports
+    return report
+
+
+def summarize(reports, top=15):
+    """Медианы нескольких замеров и самые дорогие пакеты последнего."""
+    imports = reports[-1]['imports']
+    summary = {
+        key: round(statistics.median(report[key] for report in reports), 1)
+        for key in ('wsgi_ms', 'first_request_ms', 'import_ms')
+    }
+    summary['boot_ms'] = round(summary['wsgi_ms']
+                               + summary['first_request_ms'], 1)
+    summary['modules'] = reports[-1]['modules']
+    summary['status'] = reports[-1]['status']
+    summary['packages'] = {
+        package: round(us / 1000, 1)
+        for package, us in by_package(imports)[:top]
+    }
+    summary['hints'] = hints(imports)
+    return summary
@@ -0,0 +1,227 @@
+"""
+Фоновая очередь задач в базе данных.
+
+Запрос только вставляет строку Task, а работу выполняет воркер
+`manage.py run_tasks`. Воркер забирает пачку готовых задач, помечая их
+своим токеном одним условным UPDATE, поэтому несколько воркеров не
+возьмут одну задачу дважды. Задачи одного имени с batch=True
+обрабатываются одним вызовом: так письма из пачки уходят через одно
+SMTP-соединение, а ошибка повторяет всю пачку. Остальные задачи
+выполняются и повторяются по одной. Упавшая задача повторяется
+с экспоненциальной задержкой, после TASK_MAX_ATTEMPTS попыток она
+остаётся в базе с failed=True.
+
+С TASKS_EAGER задачи выполняются сразу при постановке, без воркера.
+"""
+import json
+import logging
+import time
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+Handler = namedtuple('Handler', 'func batch max_attempts')
+
+_registry = {}
+
+
+def task(name, batch=False, max_attempts=None):
+    """
+    Регистрирует обработчик задачи. Обычный обработчик получает аргументы
+    задачи, пакетный (batch=True) - список аргументов всех задач пачки.
+    У функции появляется метод enqueue(**payload).
+    """
+    def decorator(func):
+        _registry[name] = Handler(func, batch, max_attempts)
+        func.enqueue = lambda delay=0, **payload: enqueue(name, payload,
+                                                          delay)
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _registry.get(name)
+
+
+def call(handler, payloads):
+    if handler.batch:
+        return handler.func(payloads)
+    for payload in payloads:
+        handler.func(**payload)
+
+
+def enqueue(name, payload=None, delay=0):
+    """Ставит задачу в очередь; delay - задержка в секундах."""
+    payload = payload or {}
+    if settings.TASKS_EAGER:
+        call(_registry[name], [payload])
+        return None
+    return Task.objects.create(
+        name=name,
+        payload=json.dumps(payload),
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_unique(name, payload=None, delay=0):
+    """
+    Ставит задачу, если задача с тем же именем ещё не ждёт воркера;
+    взятые воркером не считаются. Проверка и вставка - один
+    INSERT ... SELECT WHERE NOT EXISTS, поэтому одновременные вызовы
+    с разных воркеров не поставят две задачи. Возвращает True, если
+    задача поставлена.
+    """
+    payload = payload or {}
+    if settings.TASKS_EAGER:
+        call(_registry[name], [payload])
+        return True
+    table = Task._meta.db_table
+    now = timezone.now()
+    adapt = connection.ops.adapt_datetimefield_value
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (name, payload, run_at, attempts, '
+            f'failed, last_error, locked_by, created) '
+            f'SELECT %s, %s, %s, 0, %s, %s, %s, %s '
+            f'WHERE NOT EXISTS (SELECT 1 FROM {table} '
+            f'WHERE name = %s AND failed = %s AND locked_by = %s)',
+            [name, json.dumps(payload),
+             adapt(now + timedelta(seconds=delay)), False, '', '',
+             adapt(now), name, False, '']
+        )
+        return cursor.rowcount == 1
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.TASK_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+class Worker:
+    def __init__(self, batch_size=None, lease=None, log=None):
+        self.batch_size = batch_size or settings.TASK_BATCH_SIZE
+        self.lease = timedelta(seconds=lease or settings.TASK_LEASE_SECONDS)
+        self.log = log or (lambda message: None)
+        self.done = 0
+        self.failed = 0
+
+    def claim(self):
+        """Забирает пачку готовых задач, не занятых другими воркерами."""
+        now = timezone.now()
+        free = Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+        due = list(
+            Task.objects.filter(free, failed=False, run_at__lte=now)
+            .values_list('pk', flat=True)[:self.batch_size]
+        )
+        if not due:
+            return []
+        token = uuid.uuid4().hex
+        # Условие повторяется в UPDATE: задачу, которую между SELECT
+        # и UPDATE взял другой воркер, этот уже не получит
+        Task.objects.filter(free, pk__in=due).update(
+            locked_by=token, locked_until=now + self.lease
+        )
+        return list(Task.objects.filter(locked_by=token))
+
+    def fail(self, tasks, error, handler=None):
+        max_attempts = settings.TASK_MAX_ATTEMPTS
+        if handler is not None and handler.max_attempts:
+            max_attempts = handler.max_attempts
+        now = timezone.now()
+        for item in tasks:
+            item.attempts += 1
+            item.last_error = error
+            item.failed = handler is None or item.attempts >= max_attempts
+            item.run_at = now + retry_delay(item.attempts)
+            item.locked_by = ''
+            item.locked_until = None
+        Task.objects.bulk_update(
+            tasks, ['attempts', 'last_error', 'failed', 'run_at',
+                    'locked_by', 'locked_until']
+        )
+        self.failed += len(tasks)
+
+    def process(self, name, tasks):
+        handler = get_handler(name)
+        if handler is None:
+            self.fail(tasks, f'Неизвестная задача {name}')
+            return
+        if not handler.batch:
+            # Обычные задачи выполняются и учитываются по одной: ошибка
+            # одной не повторяет и не проваливает соседние
+            for item in tasks:
+                self.execute(handler, [item])
+            return
+        self.execute(handler, tasks)
+
+    def execute(self, handler, tasks):
+        """Выполняет задачи одним вызовом: успех и ошибка у них общие."""
+        try:
+            call(handler, [json.loads(item.payload) for item in tasks])
+        except Exception as error:
+            logger.exception('Задача %s не выполнена', tasks[0].name)
+            self.fail(tasks, repr(error), handler)
+            return
+        Task.objects.filter(pk__in=[item.pk for item in tasks]).delete()
+        self.done += len(tasks)
+
+    def run_batch(self):
+        """Выполняет одну пачку и возвращает число взятых задач."""
+        tasks = self.claim()
+        tasks.sort(key=lambda item: item.name)
+        for name, group in groupby(tasks, key=lambda item: item.name):
+            self.process(name, list(group))
+        return len(tasks)
+
+    def run(self, once=False, sleep=None):
+        """Обрабатывает очередь; с once - пока в ней есть готовые задачи."""
+        sleep = settings.TASK_POLL_INTERVAL if sleep is None else sleep
+        while True:
+            start = time.perf_counter()
+            count = self.run_batch()
+            if count:
+                self.log(f'Задач: {count} за '
+                         f'{time.perf_counter() - start:.2f} с')
+            elif once:
+                return
+            else:
+                time.sleep(sleep)
+
+
+def deliver(messages):
+    """Отправляет письма через одно соединение почтового бэкенда."""
+    if not messages:
+        return 0
+    with get_connection() as connection:
+        return connection.send_messages(messages)
+
+
+@task('core.send_emails', batch=True)
+def send_emails(payloads):
+    messages = []
+    for payload in payloads:
+        message = EmailMultiAlternatives(
+            payload['subject'], payload['body'], payload.get('from_email'),
+            payload['to'],
+        )
+        if payload.get('html'):
+            message.attach_alternative(payload['html'], 'text/html')
+        messages.append(message)
+    deliver(messages)
+
+
+def send_email(subject, body, to, from_email=None, html=None, delay=0):
+    """Ставит письмо в очередь core.send_emails."""
+    return send_emails.enqueue(subject=subject, body=body, to=list(to),
+                               from_email=from_email, html=html,
+                               delay=delay)
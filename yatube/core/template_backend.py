@@ -0,0 +1,75 @@
+import logging
+import time
+from pathlib import Path
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates, Template
+from django.template.utils import get_app_template_dirs
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.add_template_time(time.perf_counter() - start)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, который учитывает время рендеринга в метриках."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(
+            super().from_string(template_code).template, self
+        )
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(
+            super().get_template(template_name).template, self
+        )
+
+
+def template_names(engine, root=None):
+    """
+    Имена всех шаблонов в DIRS и каталогах templates приложений.
+    С root учитываются только каталоги внутри него.
+    """
+    directories = [*engine.engine.dirs, *get_app_template_dirs('templates')]
+    if root is not None:
+        root = Path(root).resolve()
+        directories = [directory for directory in directories
+                       if root in Path(directory).resolve().parents]
+    names = []
+    for directory in directories:
+        root = Path(directory)
+        names.extend(path.relative_to(root).as_posix()
+                     for path in sorted(root.rglob('*'))
+                     if path.is_file() and path.suffix in ('.html', '.txt'))
+    # Шаблон из DIRS перекрывает одноимённый шаблон приложения
+    return list(dict.fromkeys(names))
+
+
+def warm_templates(root=None):
+    """
+    Разбирает шаблоны заранее. С кэширующим загрузчиком первый
+    запрос воркера не тратит время на чтение и компиляцию шаблонов.
+    root ограничивает прогрев шаблонами проекта: шаблоны админки
+    компилируются при первом обращении.
+    """
+    count = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in template_names(engine, root):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as error:
+                logger.warning('Шаблон %s не скомпилирован: %s', name, error)
+            else:
+                count += 1
+    return count
@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from core import benchmark, seeding
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        seeding.seed(users=30, posts=120, comments=120, follows=120)
+
+    def test_all_routes_within_query_budget(self):
+        """Все страницы укладываются в бюджет SQL-запросов"""
+        bench = benchmark.Benchmark(repeat=1)
+        results = bench.run()
+        self.assertEqual({row['view'] for row in results},
+                         {name for name, _ in bench.routes()})
+        for row in results:
+            with self.subTest(view=row['view']):
+                self.assertLess(row['status'], 400)
+                self.assertLessEqual(row['queries'],
+                                     row['budget']['queries'])
+
+    def test_row_render_cost(self):
+        """Стоимость карточки поста измеряется для всех лент"""
+        cost = benchmark.Benchmark(repeat=1).row_render_cost(rows=5,
+                                                             repeat=3)
+        self.assertEqual(set(cost), set(benchmark.LISTING_TEMPLATES))
+        baseline = {'render_cost': {'posts/index.html': 0.5}}
+        self.assertEqual(
+            list(benchmark.compare_render_cost(cost, baseline)),
+            [('posts/index.html', 0.5, cost['posts/index.html'])]
+        )
+
+
+class BenchmarkCommandTest(SimpleTestCase):
+    def test_command_within_budgets(self):
+        """
+        Команда benchmark в autocommit укладывается в те же бюджеты,
+        что и тест в транзакции TestCase
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            with open(baseline, 'w') as file:
+                json.dump({'results': [], 'render_cost': {
+                    'posts/index.html': 0.5
+                }}, file)
+            result = subprocess.run(
+                [sys.executable, 'manage.py', 'benchmark', '--users', '30',
+                 '--posts', '120', '--comments', '120', '--follows', '120',
+                 '--repeat', '1', '--compare', baseline],
+                cwd=settings.BASE_DIR, env={**os.environ, 'SECRET_KEY': 'x'},
+                capture_output=True, text=True,
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        # Отчёт сравнивает и стоимость карточки поста
+        self.assertIn('мс 0.5 ->', result.stdout)
@@ -0,0 +1,138 @@
+import shutil
+import socketserver
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.module_loading import import_string
+
+from core import fragments
+from yatube.cache_config import ALIASES, cache_settings
+
+try:
+    import memcache
+except ImportError:
+    memcache = None
+
+
+def worker_caches(url, count=2, alias='fragments'):
+    """Отдельные экземпляры бэкенда, как в разных процессах."""
+    config = cache_settings(url)[alias]
+    backend = import_string(config['BACKEND'])
+    return [backend(config['LOCATION'], config) for _ in range(count)]
+
+
+class MemcachedStandIn(socketserver.StreamRequestHandler):
+    """Минимальный текстовый протокол memcached для тестов."""
+
+    def handle(self):
+        data = self.server.data
+        while True:
+            line = self.rfile.readline().decode().split()
+            if not line:
+                return
+            command, args = line[0], line[1:]
+            if command in ('set', 'add'):
+                key, flags, _, size = args[:4]
+                value = self.rfile.read(int(size) + 2)[:-2]
+                if command == 'add' and key in data:
+                    self.wfile.write(b'NOT_STORED\r\n')
+                    continue
+                data[key] = (flags, value)
+                self.wfile.write(b'STORED\r\n')
+            elif command == 'get':
+                for key in args:
+                    if key in data:
+                        flags, value = data[key]
+                        self.wfile.write(
+                            f'VALUE {key} {flags} {len(value)}\r\n'.encode()
+                            + value + b'\r\n'
+                        )
+                self.wfile.write(b'END\r\n')
+            elif command == 'delete':
+                found = data.pop(args[0], None) is not None
+                self.wfile.write(b'DELETED\r\n' if found
+                                 else b'NOT_FOUND\r\n')
+            elif command == 'flush_all':
+                data.clear()
+                self.wfile.write(b'OK\r\n')
+            else:
+                self.wfile.write(b'ERROR\r\n')
+
+
+class CacheConfigTest(TestCase):
+    def test_cache_settings(self):
+        """Адрес хранилища превращается в CACHES для всех алиасов"""
+        cases = (
+            ('locmem://', 'locmem.LocMemCache', 'yatube'),
+            ('file:///var/tmp/yatube', 'filebased.FileBasedCache',
+             '/var/tmp/yatube/fragments'),
+            ('db://cache_table', 'db.DatabaseCache', 'cache_table'),
+            ('memcached://10.0.0.1:11211,10.0.0.2:11211',
+             'memcached.MemcachedCache',
+             ['10.0.0.1:11211', '10.0.0.2:11211']),
+        )
+        for url, backend, location in cases:
+            with self.subTest(url=url):
+                caches = cache_settings(url, key_prefix='site', version=7)
+                self.assertEqual(tuple(caches), ALIASES)
+                config = caches['fragments']
+                self.assertTrue(config['BACKEND'].endswith(backend))
+                self.assertEqual(config['LOCATION'], location)
+                self.assertEqual(config['KEY_PREFIX'], 'site:fragments')
+                self.assertEqual(config['VERSION'], 7)
+        with self.assertRaises(ImproperlyConfigured):
+            cache_settings('redis://localhost')
+
+    def test_project_aliases(self):
+        """Фрагменты, сессии и миниатюры используют свои алиасы"""
+        self.assertEqual(set(settings.CACHES), set(ALIASES))
+        self.assertEqual(settings.SESSION_CACHE_ALIAS, 'sessions')
+        self.assertEqual(settings.THUMBNAIL_CACHE, 'thumbnails')
+
+    def assertRenderedOnce(self, workers):
+        renders = []
+
+        def render():
+            renders.append(1)
+            return 'фрагмент'
+
+        for worker in workers:
+            with mock.patch.object(fragments, 'get_cache',
+                                   return_value=worker):
+                version = fragments.get_version('index')
+                self.assertEqual(
+                    fragments.get_or_render('index_page', version, 60,
+                                            render),
+                    'фрагмент'
+                )
+        self.assertEqual(len(renders), 1)
+
+    def test_file_cache_shared_between_workers(self):
+        """Фрагмент, отрендеренный одним воркером, видят остальные"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.assertRenderedOnce(worker_caches(f'file://{directory}'))
+
+    def test_database_cache_shared_between_workers(self):
+        """Кэш в таблице базы общий для всех воркеров"""
+        call_command('createcachetable', 'yatube_cache_test')
+        self.assertRenderedOnce(worker_caches('db://yatube_cache_test'))
+
+    @unittest.skipIf(memcache is None, 'python-memcached не установлен')
+    def test_memcached_shared_between_workers(self):
+        """memcached проверяется на локальной заглушке протокола"""
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0),
+                                                 MemcachedStandIn)
+        server.daemon_threads = True
+        server.data = {}
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        host, port = server.server_address
+        self.assertRenderedOnce(worker_caches(f'memcached://{host}:{port}'))
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube.db_router import PIN_COOKIE, primary
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRouterTest(TestCase):
+    """
+    Реплика — отдельный файл SQLite, в который ничего не реплицируется:
+    так видно, из какой базы прочитана страница.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        connections.databases['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.directory, 'replica.sqlite3'),
+        }
+        call_command('migrate', database='replica', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections.databases['replica']
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.profile_url = reverse('posts:profile',
+                                   kwargs={'username': 'author'})
+
+    def test_reads_from_replica_writes_to_primary(self):
+        """Ленты читаются с реплики, посты пишутся в основную базу"""
+        post = Post.objects.create(text='Пост в основной базе',
+                                   author=self.author)
+        self.assertEqual(post._state.db, 'default')
+        response = self.client.get(self.profile_url)
+        self.assertNotContains(response, post.text)
+        with primary():
+            self.assertTrue(Post.objects.filter(pk=post.pk).exists())
+
+    def test_read_your_writes(self):
+        """
+        После публикации автор видит свой пост, даже если другой
+        пользователь успел закэшировать профиль по реплике
+        """
+        response = self.author_client.post(reverse('posts:post_create'),
+                                           data={'text': 'Свежий пост'})
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertNotContains(self.client.get(self.profile_url),
+                               'Свежий пост')
+        self.assertContains(self.author_client.get(self.profile_url),
+                            'Свежий пост')
+
+    def test_no_pin_without_writes(self):
+        """Чтение страниц не закрепляет сессию за основной базой"""
+        self.author_client.get(self.profile_url)
+        self.assertNotIn(PIN_COOKIE, self.author_client.cookies)
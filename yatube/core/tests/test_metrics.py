@@ -0,0 +1,62 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from core import metrics
+from core.middleware import PerformanceMetricsMiddleware
+
+User = get_user_model()
+
+
+class PerformanceMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_server_timing_header(self):
+        """Ответ содержит заголовок Server-Timing с SQL и шаблонами"""
+        response = self.client.get(reverse('posts:index'))
+        header = response['Server-Timing']
+        for part in ('total;dur=', 'sql;dur=', 'tpl;dur=', 'cache;desc='):
+            with self.subTest(part=part):
+                self.assertIn(part, header)
+
+    def test_metrics_collected_by_view_name(self):
+        """Замеры копятся по имени view и доступны только персоналу"""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 302)
+
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        report = self.client.get(reverse('core:metrics')).json()
+        index = report['posts:index']
+        self.assertEqual(index['count'], 2)
+        self.assertGreater(index['queries']['p50'], 0)
+        self.assertGreater(index['template_ms']['p50'], 0)
+        self.assertEqual(index['cache_hit_rate'], 0.5)
+
+    def test_hit_rate_by_user(self):
+        """Попадания в кэш считаются отдельно для вошедших и анонимов"""
+        reader = User.objects.create_user(username='reader')
+        self.client.get(reverse('posts:index'))
+        self.client.force_login(reader)
+        self.client.get(reverse('posts:index'))
+        rates = metrics.summary()['posts:index']['cache_hit_rate_by_user']
+        self.assertEqual(rates, {'authenticated': 1.0, 'anonymous': 0.0})
+
+    def test_middleware_overhead(self):
+        """Накладные расходы middleware значительно меньше миллисекунды"""
+        middleware = PerformanceMetricsMiddleware(lambda r: HttpResponse())
+        request = RequestFactory().get('/')
+        rounds = 1000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            middleware(request)
+        per_request_ms = (time.perf_counter() - start) * 1000 / rounds
+        self.assertLess(per_request_ms, 0.5)
@@ -0,0 +1,41 @@
+from django.test import TestCase, override_settings
+
+from core import benchmark, query_plans, seeding
+from posts.models import Post
+
+
+class QueryPlansTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        seeding.seed(users=30, posts=120, comments=120, follows=120)
+
+    def test_pages_use_indexes(self):
+        """Запросы страниц обходятся без полного сканирования и сортировок"""
+        for mode in ('pages', 'cursor'):
+            with self.subTest(mode=mode), \
+                    override_settings(PAGINATION_MODE=mode):
+                results = benchmark.Benchmark(repeat=1,
+                                              capture_sql=True).run()
+                self.assertEqual(list(query_plans.check(results)), [])
+
+    def test_profile_feed_is_index_only(self):
+        """Лента автора читается по составному индексу (author, -pub_date)"""
+        post = Post.objects.first()
+        sql = str(Post.objects.filter(author_id=post.author_id)
+                  .values('pk')[:10].query)
+        plan = ' '.join(query_plans.explain(sql))
+        self.assertIn('COVERING INDEX post_author_date_idx', plan)
+
+    def test_problems(self):
+        """Полное сканирование и временное B-дерево считаются проблемой"""
+        plan = [
+            'SCAN posts_post',
+            'SCAN posts_group',
+            'SCAN subquery',
+            'SEARCH posts_post USING INDEX post_author_date_idx '
+            '(author_id=?)',
+            'USE TEMP B-TREE FOR ORDER BY',
+        ]
+        self.assertEqual(list(query_plans.problems(plan)),
+                         ['SCAN posts_post', 'USE TEMP B-TREE FOR ORDER BY'])
@@ -0,0 +1,42 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase, override_settings
+
+from core import seeding
+from posts.models import Comment, Follow, Group, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SeedingTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_command_creates_rows(self):
+        """Команда создаёт заданное число строк и картинки"""
+        out = StringIO()
+        call_command('seed_yatube', users=50, groups=3, posts=300,
+                     follows=200, comments=400, images=2, batch_size=64,
+                     stdout=out)
+        self.assertEqual(User.objects.count(), 50)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 400)
+        self.assertEqual(Post.objects.exclude(image='').count(), 2)
+        self.assertTrue(Follow.objects.exists())
+        self.assertIn(seeding.PASSWORD, out.getvalue())
+
+    def test_popularity_follows_power_law(self):
+        """Самый популярный автор собирает заметную долю подписчиков"""
+        seeding.seed(users=200, posts=0, comments=0, follows=2000,
+                     groups=0)
+        top = (Follow.objects.values('author')
+               .annotate(total=Count('pk')).order_by('-total').first())
+        self.assertGreater(top['total'], 2000 / 200 * 5)
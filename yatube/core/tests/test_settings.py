@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+from importlib import import_module, reload
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import clear_url_caches, reverse
+
+from posts.models import Post, User
+
+# Выполняется в отдельном процессе: настройки, которые получает воркер
+# с YATUBE_ENV=production, без подмен тестового раннера
+PROBE = '''
+import json
+import django
+from django.conf import settings
+django.setup()
+from django.db import connection
+print(json.dumps({
+    'DEBUG': settings.DEBUG,
+    'INSTALLED_APPS': settings.INSTALLED_APPS,
+    'MIDDLEWARE': settings.MIDDLEWARE,
+    'TEMPLATES': settings.TEMPLATES,
+    'queries_logged': connection.queries_logged,
+}))
+'''
+
+
+def production_settings():
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('DEBUG', 'TEMPLATE_CACHE', 'TASKS_EAGER')}
+    env.update(YATUBE_ENV='production', SECRET_KEY='x',
+               DJANGO_SETTINGS_MODULE='yatube.settings')
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=settings.BASE_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class ProductionSettingsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.prod = production_settings()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+
+    def get_pages(self):
+        self.client.force_login(self.user)
+        for url in (reverse('posts:index'),
+                    reverse('posts:post_detail', args=[self.post.pk]),
+                    reverse('api:index')):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_no_debug_toolbar(self):
+        """В продакшене нет DEBUG и debug_toolbar"""
+        self.assertFalse(self.prod['DEBUG'])
+        self.assertNotIn('debug_toolbar', self.prod['INSTALLED_APPS'])
+        self.assertFalse([middleware
+                          for middleware in self.prod['MIDDLEWARE']
+                          if middleware.startswith('debug_toolbar')])
+        self.assertNotIn(
+            'django.template.context_processors.debug',
+            self.prod['TEMPLATES'][0]['OPTIONS']['context_processors']
+        )
+
+    def test_redirects_before_session(self):
+        """Редиректы Security и Common отвечают до загрузки сессии"""
+        middleware = self.prod['MIDDLEWARE']
+        session = middleware.index(
+            'django.contrib.sessions.middleware.SessionMiddleware'
+        )
+        for name in ('django.middleware.security.SecurityMiddleware',
+                     'django.middleware.common.CommonMiddleware'):
+            self.assertLess(middleware.index(name), session)
+
+    def test_no_query_log(self):
+        """Соединение воркера продакшена не копит SQL-запросы"""
+        self.assertFalse(self.prod['queries_logged'])
+
+    def test_debug_logs_queries(self):
+        """С DEBUG тот же стек пишет каждый запрос в connection.queries"""
+        with override_settings(DEBUG=True,
+                               MIDDLEWARE=self.prod['MIDDLEWARE'],
+                               TEMPLATES=self.prod['TEMPLATES']):
+            connection.queries_log.clear()
+            self.get_pages()
+        self.assertGreater(len(connection.queries_log), 0)
+
+    def test_no_toolbar_urls(self):
+        """Без debug_toolbar в INSTALLED_APPS нет и его адресов"""
+        urls = import_module('yatube.urls')
+        try:
+            with override_settings(INSTALLED_APPS=self.prod['INSTALLED_APPS'],
+                                   DEBUG=self.prod['DEBUG']):
+                routes = [str(pattern.pattern)
+                          for pattern in reload(urls).urlpatterns]
+            self.assertNotIn('__debug__/', routes)
+        finally:
+            reload(urls)
+            clear_url_caches()
@@ -0,0 +1,21 @@
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLiteTuningTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_connection(self):
+        """Каждое новое соединение получает настройки из SQLITE_PRAGMAS"""
+        expected = {
+            'synchronous': 1,
+            'temp_store': 2,
+            'busy_timeout': 10000,
+            'cache_size': -64 * 1024,
+        }
+        for name, value in expected.items():
+            with self.subTest(pragma=name):
+                self.assertEqual(self.pragma(name), value)
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from core import startup
+
+IMPORTTIME = '''\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     django.utils.version
+import time:       300 |        420 |   django.utils
+import time:      1000 |       1420 | django
+import time:        50 |         50 |   dotenv.main
+import time:       200 |        250 | dotenv
+'''
+
+
+class ImportTimeTest(SimpleTestCase):
+    def test_parse_importtime(self):
+        """Строки -X importtime разбираются с глубиной вложенности"""
+        imports = startup.parse_importtime(IMPORTTIME)
+        self.assertEqual(len(imports), 5)
+        self.assertEqual(imports[0], startup.Import(
+            'django.utils.version', 120, 120, 2
+        ))
+        self.assertEqual(imports[2].depth, 0)
+
+    def test_by_package(self):
+        """Собственное время складывается по пакетам верхнего уровня"""
+        imports = startup.parse_importtime(IMPORTTIME)
+        self.assertEqual(startup.by_package(imports),
+                         [('django', 1420), ('dotenv', 250)])
+        self.assertEqual(startup.hints(imports), [startup.HINTS['dotenv']])
+
+
+class StartupProfileCommandTest(SimpleTestCase):
+    def test_production_profile(self):
+        """Продакшен-профиль стартует без debug_toolbar и dotenv"""
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'startup.json')
+            call_command('startup_profile', path='/about/author/',
+                         env=['YATUBE_ENV=production'], repeat=1,
+                         output=output, stdout=out)
+            with open(output) as file:
+                report = json.load(file)
+        self.assertEqual(report['status'], '200 OK')
+        self.assertGreater(report['boot_ms'], 0)
+        self.assertNotIn('debug_toolbar', report['packages'])
+        self.assertNotIn(startup.HINTS['debug_toolbar'], report['hints'])
+        self.assertIn('Старт воркера', out.getvalue())
+
+    def test_budget(self):
+        """Старт дольше --max-boot-ms считается регрессией"""
+        with self.assertRaises(CommandError):
+            call_command('startup_profile', path='/about/author/',
+                         repeat=1, max_boot_ms=0.001, stdout=StringIO())
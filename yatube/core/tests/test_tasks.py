@@ -0,0 +1,169 @@
+import re
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+from posts.models import User
+
+calls = []
+
+
+@tasks.task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@tasks.task('tests.record_batch', batch=True)
+def record_batch(payloads):
+    calls.append([payload['value'] for payload in payloads])
+
+
+@tasks.task('tests.picky')
+def picky(value):
+    if value == 0:
+        raise ValueError('ноль')
+    calls.append(value)
+
+
+@tasks.task('tests.broken', max_attempts=2)
+def broken():
+    raise ValueError('сломано')
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        """Задача ждёт воркера и удаляется после выполнения"""
+        record.enqueue(value=1)
+        self.assertEqual(calls, [])
+        self.assertEqual(Task.objects.count(), 1)
+        worker = tasks.Worker()
+        worker.run(once=True)
+        self.assertEqual(calls, [1])
+        self.assertEqual(worker.done, 1)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager(self):
+        """С TASKS_EAGER задача выполняется сразу"""
+        record.enqueue(value=2)
+        self.assertEqual(calls, [2])
+        self.assertFalse(Task.objects.exists())
+
+    def test_delay(self):
+        """Отложенная задача не берётся раньше срока"""
+        record.enqueue(value=3, delay=60)
+        self.assertEqual(tasks.Worker().run_batch(), 0)
+
+    def test_batch_handler(self):
+        """Пакетный обработчик получает все задачи пачки одним вызовом"""
+        for value in range(3):
+            record_batch.enqueue(value=value)
+        record.enqueue(value='single')
+        tasks.Worker().run(once=True)
+        self.assertCountEqual(calls, [[0, 1, 2], 'single'])
+
+    def test_enqueue_unique(self):
+        """Уникальная задача ставится одним запросом, пока не ждёт вторая"""
+        with self.assertNumQueries(1):
+            self.assertTrue(tasks.enqueue_unique('tests.record',
+                                                 {'value': 1}))
+        self.assertFalse(tasks.enqueue_unique('tests.record', {'value': 2}))
+        tasks.Worker().claim()
+        self.assertTrue(tasks.enqueue_unique('tests.record', {'value': 3}))
+        self.assertEqual(Task.objects.count(), 2)
+        Task.objects.update(locked_until=None, locked_by='')
+        tasks.Worker().run(once=True)
+        self.assertCountEqual(calls, [1, 3])
+
+    def test_claimed_once(self):
+        """Задачу, взятую одним воркером, другой не получит"""
+        record.enqueue(value=1)
+        first, second = tasks.Worker(), tasks.Worker()
+        self.assertEqual(len(first.claim()), 1)
+        self.assertEqual(second.claim(), [])
+
+    def test_expired_lease(self):
+        """Задачу упавшего воркера берут снова после срока аренды"""
+        record.enqueue(value=1)
+        tasks.Worker().claim()
+        Task.objects.update(locked_until=timezone.now() - timedelta(1))
+        self.assertEqual(len(tasks.Worker().claim()), 1)
+
+    def test_retry(self):
+        """Ошибка откладывает задачу, после max_attempts она failed"""
+        broken.enqueue()
+        worker = tasks.Worker()
+        worker.run_batch()
+        item = Task.objects.get()
+        self.assertEqual(item.attempts, 1)
+        self.assertFalse(item.failed)
+        self.assertGreater(item.run_at, timezone.now())
+        self.assertIn('сломано', item.last_error)
+        Task.objects.update(run_at=timezone.now())
+        worker.run_batch()
+        item.refresh_from_db()
+        self.assertTrue(item.failed)
+        self.assertEqual(worker.run_batch(), 0)
+
+    def test_failure_isolated(self):
+        """Ошибка одной обычной задачи не задевает соседние из пачки"""
+        for value in range(4):
+            picky.enqueue(value=value)
+        worker = tasks.Worker()
+        worker.run_batch()
+        self.assertCountEqual(calls, [1, 2, 3])
+        self.assertEqual((worker.done, worker.failed), (3, 1))
+        item = Task.objects.get()
+        self.assertEqual(item.attempts, 1)
+        self.assertFalse(item.failed)
+        self.assertIn('ноль', item.last_error)
+
+    def test_unknown_task(self):
+        """Задача без обработчика сразу помечается failed"""
+        Task.objects.create(name='tests.missing', run_at=timezone.now())
+        tasks.Worker().run_batch()
+        self.assertTrue(Task.objects.get().failed)
+
+    def test_emails_share_connection(self):
+        """Письма пачки уходят через одно соединение"""
+        for number in range(3):
+            tasks.send_email(f'Письмо {number}', 'Текст',
+                             [f'user{number}@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+        with mock.patch('core.tasks.get_connection',
+                        wraps=tasks.get_connection) as get_connection:
+            tasks.Worker().run(once=True)
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_password_reset_queued(self):
+        """Сброс пароля не отправляет письмо в запросе"""
+        User.objects.create_user(username='user', email='user@example.com',
+                                 password='password')
+        response = self.client.post(reverse('users:password_reset_form'),
+                                    {'email': 'user@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        # Ссылка с токеном в очередь не попадает
+        self.assertNotIn('/auth/reset/', Task.objects.get().payload)
+        call_command('run_tasks', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+        link = re.search(r'https?://\S+(/auth/reset/\S+)',
+                         mail.outbox[0].body).group(1)
+        response = self.client.get(link)
+        self.assertRedirects(response, link.rsplit('/', 2)[0]
+                             + '/set-password/')
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,53 @@
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import engines
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.template_backend import template_names, warm_templates
+from posts.models import Post, User
+
+CACHED_TEMPLATES = deepcopy(settings.TEMPLATES)
+CACHED_TEMPLATES[0]['APP_DIRS'] = False
+CACHED_TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+class TemplateCacheTest(TestCase):
+    def test_warm_templates(self):
+        """Прогрев компилирует шаблоны проекта и приложений в кэш"""
+        engine = engines.all()[0]
+        names = template_names(engine)
+        self.assertIn('posts/includes/post_card.html', names)
+        self.assertIn('admin/base.html', names)
+        self.assertEqual(warm_templates(), len(names))
+        loader = engine.engine.template_loaders[0]
+        self.assertIn('posts/index.html', loader.get_template_cache)
+
+    def test_warm_project_templates(self):
+        """Прогрев с root не трогает шаблоны сторонних приложений"""
+        engine = engines.all()[0]
+        names = template_names(engine, settings.BASE_DIR)
+        self.assertIn('posts/index.html', names)
+        self.assertNotIn('admin/base.html', names)
+        self.assertEqual(warm_templates(settings.BASE_DIR), len(names))
+
+    def test_pages_render(self):
+        """Ленты рендерятся с кэширующим загрузчиком"""
+        cache.clear()
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Пост в кэшированном шаблоне',
+                            author=author)
+        warm_templates()
+        for url in (reverse('posts:index'),
+                    reverse('posts:profile', args=['author'])):
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url),
+                                    'Пост в кэшированном шаблоне')
@@ -1,5 +1,9 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from . import metrics
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path},
@@ -12,3 +16,8 @@ def csrf_failure(request, reason=''):
 
 def error_500(request):
     return render(request, 'core/error_500.html')
+
+
+@staff_member_required
+def performance_metrics(request):
+    return JsonResponse(metrics.summary(), json_dumps_params={'indent': 2})
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.contrib import admin
 
+from . import search
 from .models import Comment, Follow, Group, Post
 
 
@@ -10,6 +12,14 @@ class PostAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
     list_editable = ('group',)
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        ids = search.get_backend().search_ids(
+            search_term, limit=settings.SEARCH_ADMIN_LIMIT
+        )
+        return queryset.filter(pk__in=ids), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'slug')
@@ -0,0 +1,105 @@
+"""
+Условные GET-запросы (ETag) для лент и страницы поста.
+
+Валидатор считается без рендера шаблона: ETag складывается из версий
+кэша, которые сигналы меняют при любом изменении содержимого страницы,
+поэтому повторный визит получает 304. Last-Modified не отдаётся: дата
+последнего поста не меняется при правке, удалении и подписке, и запрос
+с одним If-Modified-Since получал бы 304 с устаревшей страницей.
+"""
+import hashlib
+
+from django.conf import settings
+from django.views.decorators.http import condition
+
+from .models import Group, Post, User
+from .utils import listing_version
+
+
+def make_etag(request, *versions):
+    """
+    Страница зависит от пользователя (шапка, кнопка подписки) и от
+    параметров запроса (номер страницы, курсор).
+    """
+    user = request.user.pk if request.user.is_authenticated else ''
+    raw = '|'.join([settings.ETAG_SALT, str(user),
+                    request.GET.urlencode(), *versions])
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _lookup(request, queryset):
+    """Строка для ETag выбирается один раз за запрос."""
+    if not hasattr(request, '_conditional_row'):
+        rows = list(queryset[:1])
+        request._conditional_row = rows[0] if rows else None
+    return request._conditional_row
+
+
+def index_etag(request, *args, **kwargs):
+    return make_etag(request, listing_version('index'))
+
+
+def group_row(request, slug):
+    """(pk,) группы или None."""
+    return _lookup(request, Group.objects.filter(slug=slug)
+                   .values_list('pk'))
+
+
+def group_etag(request, slug):
+    row = group_row(request, slug)
+    if row is None:
+        return None
+    return make_etag(request, listing_version('group', row[0]))
+
+
+def author_row(request, username):
+    """(pk,) автора или None."""
+    return _lookup(request, User.objects.filter(username=username)
+                   .values_list('pk'))
+
+
+def profile_etag(request, username):
+    row = author_row(request, username)
+    if row is None:
+        return None
+    return make_etag(request, listing_version('profile', row[0]),
+                     listing_version('followers', row[0]))
+
+
+def post_row(request, post_id):
+    """(автор,) поста или None."""
+    return _lookup(request, Post.objects.filter(pk=post_id)
+                   .values_list('author_id'))
+
+
+def post_etag(request, post_id):
+    row = post_row(request, post_id)
+    if row is None:
+        return None
+    # На странице поста выводится число постов автора
+    return make_etag(request, listing_version('post', post_id),
+                     listing_version('profile', row[0]))
+
+
+index = condition(index_etag)
+group = condition(group_etag)
+profile = condition(profile_etag)
+post = condition(post_etag)
+
+
+def with_comments(etag_func):
+    """
+    ETag JSON-ленты: в ней есть comments_count, который меняют
+    комментарии, не трогая версии лент.
+    """
+    def etag(request, *args, **kwargs):
+        value = etag_func(request, *args, **kwargs)
+        if value is None:
+            return None
+        return make_etag(request, value, listing_version('comments'))
+    return etag
+
+
+api_index = condition(with_comments(index_etag))
+api_group = condition(with_comments(group_etag))
+api_profile = condition(with_comments(profile_etag))
@@ -0,0 +1,121 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from users.models import Profile
+
+from .models import Comment, Follow, Group, Post, User
+from .utils import bulk_create_chunked
+
+BATCH_SIZE = 1000
+
+
+def count_of(model, field, outer='pk'):
+    """Подзапрос COUNT(*) связанных строк для UPDATE ... SET."""
+    counted = (
+        model.objects.filter(**{field: OuterRef(outer)})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def recount_profile(user):
+    profile, _ = Profile.objects.update_or_create(
+        user=user,
+        defaults={
+            'posts_count': Post.objects.filter(author=user).count(),
+            'followers_count': Follow.objects.filter(author=user).count(),
+        }
+    )
+    return profile
+
+
+def get_profile(user):
+    """
+    Профиль со счётчиками. Отсутствующий профиль считается на лету и
+    не сохраняется: чтение не должно писать в базу.
+    """
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        return Profile(
+            user=user,
+            posts_count=Post.objects.filter(author=user).count(),
+            followers_count=Follow.objects.filter(author=user).count(),
+        )
+
+
+def followers_count(user):
+    count = (
+        Profile.objects.filter(user=user)
+        .values_list('followers_count', flat=True)
+        .first()
+    )
+    if count is None:
+        return Follow.objects.filter(author=user).count()
+    return count
+
+
+def _change(queryset, field, delta):
+    if delta < 0:
+        # Не уходим в минус, если счётчик разошёлся с данными
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def change_profile(user_id, field, delta):
+    if user_id is None:
+        return
+    updated = _change(Profile.objects.filter(user_id=user_id), field, delta)
+    if not updated and delta > 0:
+        recount_profile(User.objects.get(pk=user_id))
+
+
+def change_group(group_id, delta):
+    if group_id is not None:
+        _change(Group.objects.filter(pk=group_id), 'posts_count', delta)
+
+
+def change_post(post_id, delta):
+    _change(Post.objects.filter(pk=post_id), 'comments_count', delta)
+
+
+def recount_profiles(user_ids=None):
+    """
+    Создаёт недостающие профили и пересчитывает их счётчики; без
+    user_ids - у всех пользователей.
+    """
+    users = User.objects.filter(profile__isnull=True)
+    profiles = Profile.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+        profiles = profiles.filter(user_id__in=user_ids)
+    bulk_create_chunked(
+        Profile,
+        (
+            Profile(user_id=user_id)
+            for user_id in users.values_list('pk', flat=True).iterator()
+        ),
+        BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    profiles.update(
+        posts_count=count_of(Post, 'author', outer='user'),
+        followers_count=count_of(Follow, 'author', outer='user'),
+    )
+
+
+def recount_groups(group_ids=None):
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    groups.update(posts_count=count_of(Post, 'group'))
+
+
+def recount_all():
+    """Пересчитывает все счётчики набором UPDATE-запросов."""
+    recount_profiles()
+    Post.objects.update(comments_count=count_of(Comment, 'post'))
+    recount_groups()
@@ -24,3 +24,26 @@ class CommentForm(forms.ModelForm):
         widgets = {
             'text': forms.Textarea(attrs={'class': 'form-control'})
         }
+
+
+class ExportForm(forms.Form):
+    """Фильтры выгрузки: общие для страницы сотрудников и команды."""
+    format = forms.ChoiceField(choices=[('csv', 'CSV'),
+                                        ('jsonl', 'JSON Lines')],
+                               required=False)
+    author = forms.CharField(max_length=150, required=False)
+    group = forms.SlugField(required=False)
+    since = forms.DateField(required=False)
+    until = forms.DateField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        since, until = cleaned_data.get('since'), cleaned_data.get('until')
+        if since and until and since > until:
+            raise forms.ValidationError('Начало периода позже конца')
+        cleaned_data['format'] = cleaned_data.get('format') or 'csv'
+        return cleaned_data
+
+    def filters(self):
+        return {key: self.cleaned_data[key]
+                for key in ('author', 'group', 'since', 'until')}
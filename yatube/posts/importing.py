@@ -0,0 +1,215 @@
+"""
+Массовый импорт постов из JSON Lines и CSV.
+
+Файл читается потоком в формате выгрузки posts.export: author, group,
+pub_date, text, image. Авторы и группы находятся пачками и запоминаются
+в словарях, посты вставляются через bulk_create по транзакции на пачку,
+а изображения копируются в хранилище в пуле потоков. Сигналы при
+пакетной вставке не срабатывают, поэтому счётчики авторов и групп,
+поисковый индекс и ленты подписок обновляются для каждой пачки в её
+транзакции: ошибка в файле оставляет уже вставленные пачки целиком.
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.fragments import bump_version
+
+from . import counters, search, timeline
+from .models import Group, Post, User
+from .utils import chunked, listing_namespace
+
+BATCH_SIZE = 1000
+WORKERS = 8
+# Ограничение на число параметров одного запроса в SQLite
+LOOKUP_SIZE = 500
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def read_rows(file, fmt):
+    """Поток словарей из открытого файла."""
+    if fmt == 'csv':
+        yield from csv.DictReader(file)
+    elif fmt == 'jsonl':
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise ImportFileError(f'Строка {number}: {error}')
+    else:
+        raise ImportFileError(f'Неизвестный формат: {fmt}')
+
+
+def guess_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    return 'csv' if extension == '.csv' else 'jsonl'
+
+
+def assign_pks(posts):
+    """
+    bulk_create в SQLite не возвращает id. Пачка вставляется в
+    транзакции, которая держит блокировку записи, поэтому её посты -
+    последние строки таблицы в порядке вставки.
+    """
+    if not posts or posts[0].pk is not None:
+        return
+    ids = (Post.objects.order_by('-pk')
+           .values_list('pk', flat=True)[:len(posts)])
+    for post, pk in zip(posts, sorted(ids)):
+        post.pk = pk
+
+
+class Importer:
+    def __init__(self, batch_size=BATCH_SIZE, workers=WORKERS,
+                 images_dir=None, create_missing=False, log=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.images_dir = images_dir
+        self.create_missing = create_missing
+        self.log = log or (lambda message: None)
+        # Имя пользователя и адрес группы -> pk
+        self.authors = {}
+        self.groups = {}
+        self.imported = 0
+        self.skipped = 0
+        self.images = 0
+        self.author_ids = set()
+        self.group_ids = set()
+
+    def _resolve(self, model, field, known, keys, create):
+        missing = set(keys) - known.keys() - {''}
+        for chunk in chunked(missing, LOOKUP_SIZE):
+            known.update(model.objects.filter(**{f'{field}__in': chunk})
+                         .values_list(field, 'pk'))
+        missing -= known.keys()
+        if missing and self.create_missing:
+            model.objects.bulk_create(create(key) for key in missing)
+            for chunk in chunked(missing, LOOKUP_SIZE):
+                known.update(model.objects.filter(**{f'{field}__in': chunk})
+                             .values_list(field, 'pk'))
+
+    def resolve(self, rows):
+        password = make_password(None)
+        self._resolve(User, 'username', self.authors,
+                      (row.get('author') or '' for row in rows),
+                      lambda username: User(username=username,
+                                            password=password))
+        self._resolve(Group, 'slug', self.groups,
+                      (row.get('group') or '' for row in rows),
+                      lambda slug: Group(title=slug, slug=slug))
+
+    def copy_image(self, path):
+        """Копирует файл в хранилище и возвращает его новое имя."""
+        if not path:
+            return ''
+        if self.images_dir is not None:
+            path = os.path.join(self.images_dir, path)
+        try:
+            with open(path, 'rb') as file:
+                return default_storage.save(
+                    f'posts/{os.path.basename(path)}', File(file)
+                )
+        except OSError as error:
+            self.log(f'Изображение не скопировано: {error}')
+            return ''
+
+    def build(self, number, row):
+        """Пост из строки файла или None, если строку надо пропустить."""
+        text = (row.get('text') or '').strip()
+        author_id = self.authors.get(row.get('author') or '')
+        group = row.get('group') or ''
+        if not text or author_id is None:
+            self.log(f'Строка {number}: нет текста или автора '
+                     f'{row.get("author")!r}')
+            return None
+        if group and group not in self.groups:
+            self.log(f'Строка {number}: нет группы {group!r}')
+            return None
+        pub_date = timezone.now()
+        if row.get('pub_date'):
+            try:
+                pub_date = parse_datetime(row['pub_date'])
+            except ValueError:
+                pub_date = None
+            if pub_date is None:
+                self.log(f'Строка {number}: неверная дата '
+                         f'{row["pub_date"]!r}')
+                return None
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        return Post(text=text, author_id=author_id,
+                    group_id=self.groups.get(group), pub_date=pub_date)
+
+    def import_batch(self, executor, batch):
+        self.resolve([row for _, row in batch])
+        posts, images = [], []
+        for number, row in batch:
+            post = self.build(number, row)
+            if post is not None:
+                posts.append(post)
+                images.append(row.get('image') or '')
+        # Копируются только изображения постов, прошедших проверку
+        for post, image in zip(posts, executor.map(self.copy_image, images)):
+            post.image = image
+        # bulk_create заполняет поле с auto_now_add текущим временем,
+        # дата из файла возвращается отдельным UPDATE
+        dates = [post.pub_date for post in posts]
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            assign_pks(posts)
+            for post, pub_date in zip(posts, dates):
+                post.pub_date = pub_date
+            Post.objects.bulk_update(posts, ['pub_date'])
+            self.sync(posts)
+        self.skipped += len(batch) - len(posts)
+        self.imported += len(posts)
+        self.images += sum(bool(post.image) for post in posts)
+        self.author_ids.update(post.author_id for post in posts)
+        self.group_ids.update(post.group_id for post in posts)
+
+    def sync(self, posts):
+        """То, что при обычном сохранении делают сигналы, для пачки."""
+        counters.recount_profiles({post.author_id for post in posts})
+        counters.recount_groups({post.group_id for post in posts} - {None})
+        search.get_backend().index_new_posts(posts)
+        if timeline.is_enabled():
+            timeline.fanout_new_posts(posts)
+
+    def run(self, rows):
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for batch in chunked(enumerate(rows, 1), self.batch_size):
+                    self.import_batch(executor, batch)
+                    elapsed = time.perf_counter() - start
+                    self.log(f'Импортировано {self.imported}, '
+                             f'{self.imported / elapsed:.0f} строк/с')
+        finally:
+            # Уже вставленные пачки остаются и после ошибки в файле
+            self.invalidate()
+        return time.perf_counter() - start
+
+    def invalidate(self):
+        """Сбрасывает кэш лент, в которые попали импортированные посты."""
+        if not self.imported:
+            return
+        bump_version(
+            listing_namespace('index'),
+            *(listing_namespace('profile', pk) for pk in self.author_ids),
+            *(listing_namespace('group', pk)
+              for pk in self.group_ids - {None})
+        )
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+from posts.forms import ExportForm
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты, комментарии или подписки в CSV или '
+        'JSON Lines, не загружая строки в память целиком'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(export.EXPORTS))
+        parser.add_argument('--format', choices=sorted(export.FORMATS),
+                            default='csv')
+        parser.add_argument('--author', help='Имя пользователя автора')
+        parser.add_argument('--group', help='Адрес группы')
+        parser.add_argument('--since', help='Начало периода, ГГГГ-ММ-ДД')
+        parser.add_argument('--until', help='Конец периода, ГГГГ-ММ-ДД')
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.CHUNK_SIZE)
+        parser.add_argument('--output', help='Файл; по умолчанию stdout')
+
+    def handle(self, *args, **options):
+        form = ExportForm({
+            key: options[key]
+            for key in ('format', 'author', 'group', 'since', 'until')
+            if options[key] is not None
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        try:
+            lines = export.stream(options['kind'],
+                                  form.cleaned_data['format'],
+                                  chunk_size=options['chunk_size'],
+                                  **form.filters())
+        except export.ExportError as error:
+            raise CommandError(error)
+        output = options['output']
+        if output is None:
+            self.write_lines(lines, self.stdout)
+        else:
+            with open(output, 'w', encoding='utf-8', newline='') as file:
+                self.write_lines(lines, file)
+
+    @staticmethod
+    def write_lines(lines, file):
+        for line in lines:
+            file.write(line)
@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Параллельно строит миниатюры для уже загруженных изображений'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+                            default=settings.THUMBNAIL_WORKERS * 2)
+        parser.add_argument('--force', action='store_true',
+                            help='Перестроить и уже готовые миниатюры')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['force']:
+            posts = posts.filter(thumbnail_url='')
+        post_ids = list(posts.values_list('pk', flat=True))
+        start = time.perf_counter()
+        done = sum(
+            url is not None
+            for url in thumbnails.backfill(post_ids, options['workers'])
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Миниатюры построены для {done} из {len(post_ids)} постов '
+            f'за {time.perf_counter() - start:.1f} с'
+        ))
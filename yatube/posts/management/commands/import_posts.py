@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import importing
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSON Lines или CSV (формат export_data '
+        'posts) пакетными вставками'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('csv', 'jsonl'),
+                            help='По умолчанию определяется по расширению')
+        parser.add_argument('--images-dir',
+                            help='Каталог, от которого отсчитываются пути '
+                                 'изображений')
+        parser.add_argument('--create-missing', action='store_true',
+                            help='Создавать неизвестных авторов и группы')
+        parser.add_argument('--batch-size', type=int,
+                            default=importing.BATCH_SIZE)
+        parser.add_argument('--workers', type=int,
+                            default=importing.WORKERS,
+                            help='Потоки копирования изображений')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or importing.guess_format(path)
+        importer = importing.Importer(
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            images_dir=options['images_dir'],
+            create_missing=options['create_missing'],
+            log=self.stdout.write,
+        )
+        try:
+            with open(path, encoding='utf-8', newline='') as file:
+                seconds = importer.run(importing.read_rows(file, fmt))
+        except (OSError, importing.ImportFileError) as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано {importer.imported} постов '
+            f'(пропущено {importer.skipped}, изображений {importer.images}) '
+            f'за {seconds:.1f} с, '
+            f'{importer.imported / max(seconds, 1e-9):.0f} строк/с'
+        ))
+        if importer.images:
+            self.stdout.write('Миниатюры можно построить командой '
+                              'generate_thumbnails')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters, timeline
+from posts.models import TimelineEntry
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает материализованные ленты подписок'
+
+    def handle(self, *args, **options):
+        # Раскладка зависит от числа подписчиков автора
+        counters.recount_all()
+        timeline.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в лентах: {TimelineEntry.objects.count()}'
+        ))
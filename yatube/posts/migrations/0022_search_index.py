@@ -0,0 +1,35 @@
+from django.db import migrations
+
+CREATE = (
+    'CREATE VIRTUAL TABLE posts_post_fts USING fts5(text)',
+    'CREATE VIRTUAL TABLE posts_comment_fts USING fts5(post_id UNINDEXED, '
+    'text)',
+    'INSERT INTO posts_post_fts (rowid, text) SELECT id, text FROM posts_post',
+    'INSERT INTO posts_comment_fts (rowid, post_id, text) '
+    'SELECT id, post_id, text FROM posts_comment',
+)
+DROP = (
+    'DROP TABLE IF EXISTS posts_post_fts',
+    'DROP TABLE IF EXISTS posts_comment_fts',
+)
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        # Индекс FTS5 есть только в SQLite, другие базы ищут через icontains
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_post_thumbnail_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE), run(DROP)),
+    ]
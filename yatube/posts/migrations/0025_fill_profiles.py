@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def count_of(model, field):
+    counted = (
+        model.objects.filter(**{field: OuterRef('user')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def fill_profiles(apps, schema_editor):
+    """Профили со счётчиками для пользователей, созданных до них."""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Profile = apps.get_model('users', 'Profile')
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    Profile.objects.bulk_create(
+        (Profile(user_id=user_id) for user_id in
+         User.objects.filter(profile__isnull=True)
+         .values_list('pk', flat=True).iterator()),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    Profile.objects.update(
+        posts_count=count_of(Post, 'author'),
+        followers_count=count_of(Follow, 'author'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0002_profile_post_notifications'),
+        ('posts', '0024_notification'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_profiles, migrations.RunPython.noop),
+    ]
@@ -12,11 +12,28 @@ class Group(models.Model):
         max_length=50,
         unique=True,
     )
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
 
     def __str__(self) -> str:
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    LISTING_FIELDS = (
+        'text', 'pub_date', 'image', 'thumbnail_url', 'comments_count',
+        'author__username', 'group__title', 'group__slug',
+    )
+
+    def for_listing(self):
+        """
+        Посты для лент: автор и группа подтягиваются одним JOIN,
+        выбираются только колонки, которые выводят шаблоны.
+        """
+        return self.select_related('author', 'group').only(
+            *self.LISTING_FIELDS
+        )
+
+
 class Post(models.Model):
     group = models.ForeignKey(
         Group,
@@ -48,15 +65,40 @@ class Post(models.Model):
         blank=True,
         help_text='Изображение поста'
     )
+    thumbnail_url = models.CharField(
+        'Адрес миниатюры',
+        max_length=255,
+        blank=True,
+        editable=False
+    )
+    comments_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_date_idx'),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_date_idx'),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем группу, чтобы пересчитать счётчики при её смене
+        instance._loaded_group_id = instance.__dict__.get('group_id')
+        return instance
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -77,6 +119,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(fields=['post', '-created', '-id'],
+                         name='comment_post_created_idx'),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -102,5 +148,84 @@ class Follow(models.Model):
             models.UniqueConstraint(fields=['user', 'author'],
                                     name='unique_follow')
         ]
+        indexes = [
+            # (user, author) покрывает уникальный индекс, обратный
+            # порядок нужен для выборки подписчиков автора
+            models.Index(fields=['author', 'user'],
+                         name='follow_author_user_idx'),
+        ]
         verbose_name = 'Подписка',
         verbose_name_plural = 'Подписки'
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique_timeline_entry')
+        ]
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-post'],
+                         name='timeline_user_date_idx'),
+            models.Index(fields=['user', 'author'],
+                         name='timeline_user_author_idx'),
+        ]
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+
+
+class Notification(models.Model):
+    """
+    Письмо подписчику о новом посте автора, ещё не отправленное.
+    Строка удаляется после отправки, см. posts/notifications.py.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Подписчик'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Пост'
+    )
+    digest = models.BooleanField('В сводку', default=False)
+
+    class Meta:
+        constraints = [
+            # Повтор задачи раскладки не создаёт второе письмо
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique_notification')
+        ]
+        indexes = [
+            models.Index(fields=['post', 'digest'],
+                         name='notification_post_idx'),
+            models.Index(fields=['digest', 'user'],
+                         name='notification_digest_idx'),
+        ]
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
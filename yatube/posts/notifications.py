@@ -0,0 +1,171 @@
+"""
+Письма подписчикам о новых постах.
+
+Создание поста ставит в очередь одну задачу раскладки. Она читает
+подписчиков автора, включивших письма, пачками по ключу user_id и
+вставляет строки Notification через bulk_create: каждая пачка - короткая
+отдельная запись, поэтому даже миллион подписчиков не держит блокировку
+базы. Затем отдельные задачи отправляют письма пачками через одно
+соединение. В режиме сводки посты копятся до задачи send_digests,
+которая запускается раз в NOTIFICATION_DIGEST_INTERVAL и собирает их
+в одно письмо на подписчика.
+"""
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db.models import Max
+from django.template.loader import get_template, render_to_string
+from django.urls import reverse
+
+from core import tasks
+from users.models import Profile
+
+from .models import Follow, Notification, Post, User
+
+SUBSCRIBED = (Profile.NOTIFY_INSTANT, Profile.NOTIFY_DIGEST)
+DIGEST_TASK = 'posts.send_digests'
+
+
+def subscriber_chunks(author_id, size):
+    """
+    Подписчики автора с включёнными письмами пачками (user_id, режим).
+    Каждая пачка - отдельный запрос по индексу (author, user), без
+    долгого курсора по всей таблице подписок.
+    """
+    last = 0
+    while True:
+        chunk = list(
+            Follow.objects.filter(
+                author_id=author_id,
+                user_id__gt=last,
+                user__profile__post_notifications__in=SUBSCRIBED,
+            ).order_by('user_id').values_list(
+                'user_id', 'user__profile__post_notifications'
+            )[:size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1][0]
+
+
+def fanout(post_id):
+    """Создаёт уведомления о посте и ставит в очередь их отправку."""
+    post = Post.objects.filter(pk=post_id).only('author_id').first()
+    if post is None:
+        return
+    instant = digest = 0
+    for chunk in subscriber_chunks(post.author_id,
+                                   settings.NOTIFICATION_BATCH_SIZE):
+        notifications = [
+            Notification(user_id=user_id, post_id=post_id,
+                         digest=mode == Profile.NOTIFY_DIGEST)
+            for user_id, mode in chunk
+        ]
+        Notification.objects.bulk_create(notifications,
+                                         ignore_conflicts=True)
+        digests = sum(item.digest for item in notifications)
+        digest += digests
+        instant += len(notifications) - digests
+    if instant:
+        send_post_notifications.enqueue(post_id=post_id)
+    if digest:
+        schedule_digest()
+
+
+def schedule_digest():
+    """
+    Одна отложенная задача сводки собирает все посты интервала. Сводка,
+    которую уже выполняет воркер, не считается: новые уведомления она
+    может не увидеть.
+    """
+    tasks.enqueue_unique(DIGEST_TASK,
+                         delay=settings.NOTIFICATION_DIGEST_INTERVAL)
+
+
+def absolute_url(name, *args):
+    return settings.SITE_URL + reverse(name, args=args)
+
+
+@tasks.task('posts.notify_followers')
+def notify_followers(post_id):
+    fanout(post_id)
+
+
+@tasks.task('posts.send_post_notifications')
+def send_post_notifications(post_id):
+    """Письма о посте, пачками по NOTIFICATION_BATCH_SIZE на соединение."""
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    if post is None:
+        return
+    pending = Notification.objects.filter(post_id=post_id, digest=False)
+    subject = f'Новый пост: {post.author.get_full_name() or post.author}'
+    body = render_to_string('posts/emails/new_post.txt', {
+        'post': post,
+        'post_url': absolute_url('posts:post_detail', post.pk),
+    })
+    while True:
+        chunk = list(pending.values_list('pk', 'user__email')
+                     [:settings.NOTIFICATION_BATCH_SIZE])
+        if not chunk:
+            return
+        tasks.deliver([EmailMessage(subject, body, to=[email])
+                       for _, email in chunk if email])
+        # Отправленная пачка удаляется: повтор задачи после ошибки
+        # продолжит с неотправленных
+        Notification.objects.filter(
+            pk__in=[pk for pk, _ in chunk]
+        ).delete()
+
+
+@tasks.task(DIGEST_TASK)
+def send_digests():
+    """Одно письмо на подписчика со всеми постами, накопленными в сводку."""
+    # Уведомления, созданные во время отправки, уйдут следующей сводкой
+    last = Notification.objects.filter(digest=True).aggregate(
+        last=Max('pk')
+    )['last']
+    if last is None:
+        return
+    pending = Notification.objects.filter(digest=True, pk__lte=last)
+    user_id = 0
+    while True:
+        user_ids = list(
+            pending.filter(user_id__gt=user_id).order_by('user_id')
+            .values_list('user_id', flat=True).distinct()
+            [:settings.NOTIFICATION_BATCH_SIZE]
+        )
+        if not user_ids:
+            return
+        batch = pending.filter(user_id__in=user_ids)
+        tasks.deliver(digest_messages(user_ids, batch))
+        batch.delete()
+        user_id = user_ids[-1]
+
+
+def digest_messages(user_ids, notifications):
+    users = User.objects.in_bulk(user_ids)
+    rows = (notifications.select_related('post__author')
+            .order_by('user_id', '-post__pub_date'))
+    # Шаблон разбирается один раз на пачку, а не на каждое письмо
+    template = get_template('posts/emails/digest.txt')
+    messages = []
+    for user_id, group in groupby(rows, key=lambda item: item.user_id):
+        user = users[user_id]
+        posts = [item.post for item in group]
+        if not user.email:
+            continue
+        body = template.render({
+            'user': user,
+            'posts': [
+                (post, absolute_url('posts:post_detail', post.pk))
+                for post in posts[:settings.NOTIFICATION_DIGEST_POSTS]
+            ],
+            'more': max(len(posts) - settings.NOTIFICATION_DIGEST_POSTS, 0),
+            'follow_url': absolute_url('posts:follow_index'),
+        })
+        messages.append(EmailMessage(
+            f'Новые посты в подписках: {len(posts)}', body, to=[user.email]
+        ))
+    return messages
@@ -0,0 +1,191 @@
+"""
+Полнотекстовый поиск по текстам постов и комментариев.
+
+Бэкенд выбирается настройкой SEARCH_BACKEND. Для SQLite используется
+индекс FTS5 (таблицы создаёт миграция 0022), для остальных баз —
+запасной вариант на icontains.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+TERM_RE = re.compile(r'\w+')
+
+
+class BaseSearchBackend:
+    def index_post(self, post):
+        pass
+
+    def index_new_posts(self, posts):
+        """Индексирует посты, созданные без сигналов (bulk_create)."""
+        for post in posts:
+            self.index_post(post)
+
+    def remove_post(self, post_id):
+        pass
+
+    def index_comment(self, comment):
+        pass
+
+    def remove_comment(self, comment_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def count(self, query):
+        raise NotImplementedError
+
+    def search_ids(self, query, offset=0, limit=None):
+        """id постов по убыванию релевантности."""
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Поиск через icontains для баз без полнотекстового индекса."""
+
+    def _queryset(self, query):
+        condition = Q()
+        for term in TERM_RE.findall(query):
+            condition &= Q(text__icontains=term) | Q(
+                comments__text__icontains=term
+            )
+        return Post.objects.filter(condition).distinct()
+
+    def count(self, query):
+        return self._queryset(query).count()
+
+    def search_ids(self, query, offset=0, limit=None):
+        ids = self._queryset(query).values_list('pk', flat=True)
+        stop = None if limit is None else offset + limit
+        return list(ids[offset:stop])
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    Инвертированный индекс FTS5: rowid таблицы posts_post_fts совпадает
+    с id поста, posts_comment_fts — с id комментария.
+    """
+    MATCHES = '''
+        SELECT rowid AS post_id, bm25(posts_post_fts) AS score
+        FROM posts_post_fts WHERE posts_post_fts MATCH %s
+        UNION ALL
+        SELECT post_id, bm25(posts_comment_fts) AS score
+        FROM posts_comment_fts WHERE posts_comment_fts MATCH %s
+    '''
+
+    @staticmethod
+    def match_expression(query):
+        """Запрос пользователя в виде безопасного выражения MATCH."""
+        terms = TERM_RE.findall(query)
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"' for term in terms) + '*'
+
+    def _execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def index_post(self, post):
+        self.remove_post(post.pk)
+        self._execute(
+            'INSERT INTO posts_post_fts (rowid, text) VALUES (%s, %s)',
+            [post.pk, post.text]
+        )
+
+    def index_new_posts(self, posts):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO posts_post_fts (rowid, text) VALUES (%s, %s)',
+                [(post.pk, post.text) for post in posts]
+            )
+
+    def remove_post(self, post_id):
+        self._execute('DELETE FROM posts_post_fts WHERE rowid = %s',
+                      [post_id])
+
+    def index_comment(self, comment):
+        self.remove_comment(comment.pk)
+        self._execute(
+            'INSERT INTO posts_comment_fts (rowid, post_id, text) '
+            'VALUES (%s, %s, %s)',
+            [comment.pk, comment.post_id, comment.text]
+        )
+
+    def remove_comment(self, comment_id):
+        self._execute('DELETE FROM posts_comment_fts WHERE rowid = %s',
+                      [comment_id])
+
+    def rebuild(self):
+        self._execute('DELETE FROM posts_post_fts')
+        self._execute('DELETE FROM posts_comment_fts')
+        self._execute(
+            'INSERT INTO posts_post_fts (rowid, text) '
+            'SELECT id, text FROM posts_post'
+        )
+        self._execute(
+            'INSERT INTO posts_comment_fts (rowid, post_id, text) '
+            'SELECT id, post_id, text FROM posts_comment'
+        )
+
+    def count(self, query):
+        match = self.match_expression(query)
+        if match is None:
+            return 0
+        rows = self._execute(
+            f'SELECT COUNT(DISTINCT post_id) FROM ({self.MATCHES})',
+            [match, match]
+        )
+        return rows[0][0]
+
+    def search_ids(self, query, offset=0, limit=None):
+        match = self.match_expression(query)
+        if match is None:
+            return []
+        rows = self._execute(
+            f'SELECT post_id FROM ({self.MATCHES}) GROUP BY post_id '
+            f'ORDER BY MIN(score) LIMIT %s OFFSET %s',
+            [match, match, -1 if limit is None else limit, offset]
+        )
+        return [post_id for post_id, in rows]
+
+
+def get_backend():
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTS5Backend()
+    return DatabaseSearchBackend()
+
+
+class SearchResults:
+    """Ленивый результат поиска, который понимает Paginator."""
+
+    def __init__(self, query, backend=None):
+        self.query = query
+        self.backend = backend or get_backend()
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.query)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        limit = None if key.stop is None else key.stop - start
+        ids = self.backend.search_ids(self.query, start, limit)
+        posts = Post.objects.for_listing().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,131 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, notifications, search, tasks, timeline
+from .models import Comment, Follow, Post
+from .utils import bump_comments, bump_listings, bump_page
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    if created:
+        counters.change_profile(instance.author_id, 'posts_count', 1)
+        counters.change_group(instance.group_id, 1)
+    elif (hasattr(instance, '_loaded_group_id')
+          and instance._loaded_group_id != instance.group_id):
+        counters.change_group(instance._loaded_group_id, -1)
+        counters.change_group(instance.group_id, 1)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post(sender, instance, **kwargs):
+    bump_listings(instance, getattr(instance, '_loaded_group_id', None))
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.change_profile(instance.author_id, 'posts_count', -1)
+    counters.change_group(instance.group_id, -1)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    bump_listings(instance)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.change_post(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.change_post(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    bump_comments(instance.post_id)
+
+
+@receiver(post_save, sender=Follow)
+def count_saved_follow(sender, instance, created, **kwargs):
+    if created:
+        counters.change_profile(instance.author_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    counters.change_profile(instance.author_id, 'followers_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_followers(sender, instance, **kwargs):
+    bump_page('followers', instance.author_id)
+
+
+# Раскладка по лентам растёт с числом подписчиков и постов автора,
+# поэтому выполняется воркером очереди, а не в запросе
+@receiver(post_save, sender=Post)
+def fanout_new_post(sender, instance, created, **kwargs):
+    if created and timeline.is_enabled():
+        tasks.fanout_post.enqueue(post_id=instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created and timeline.is_enabled():
+        tasks.backfill_follow.enqueue(user_id=instance.user_id,
+                                      author_id=instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def notify_followers(sender, instance, created, **kwargs):
+    if created:
+        notifications.notify_followers.enqueue(post_id=instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def notify_new_follower(sender, instance, created, **kwargs):
+    if created:
+        tasks.notify_new_followers.enqueue(user_id=instance.user_id,
+                                           author_id=instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(sender, instance, **kwargs):
+    if timeline.is_enabled():
+        timeline.prune_follow(instance)
+
+
+# Режим автора (раскладка или чтение при запросе) меняется при переходе
+# через лимит подписчиков; ленты догоняют его в фоновой задаче
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def switch_author_mode(sender, instance, **kwargs):
+    if timeline.is_enabled() and timeline.switch_mode(instance.author_id):
+        tasks.sync_author_timeline.enqueue(author_id=instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    search.get_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.get_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, **kwargs):
+    search.get_backend().index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_deleted_comment(sender, instance, **kwargs):
+    search.get_backend().remove_comment(instance.pk)
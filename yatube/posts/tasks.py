@@ -0,0 +1,69 @@
+"""
+Фоновые задачи постов: раскладка по лентам подписок и письма авторам
+о новых подписчиках. Ставятся в очередь сигналами, см. posts/signals.py.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.template.loader import get_template
+from django.urls import reverse
+
+from core import tasks
+
+from . import timeline
+from .models import Follow, Post, User
+
+
+@tasks.task('posts.fanout_post')
+def fanout_post(post_id):
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    # Пост могли удалить, пока задача ждала в очереди
+    if post is not None:
+        timeline.fanout_post(post)
+
+
+@tasks.task('posts.backfill_follow')
+def backfill_follow(user_id, author_id):
+    follow = Follow.objects.select_related('author').filter(
+        user_id=user_id, author_id=author_id
+    ).first()
+    if follow is not None:
+        timeline.backfill_follow(follow)
+
+
+@tasks.task('posts.sync_author_timeline')
+def sync_author_timeline(author_id):
+    author = User.objects.filter(pk=author_id).first()
+    if author is not None:
+        timeline.sync_author(author)
+
+
+@tasks.task('posts.notify_new_followers', batch=True)
+def notify_new_followers(payloads):
+    """Письма авторам о новых подписчиках, одним соединением на пачку."""
+    pairs = {(payload['user_id'], payload['author_id'])
+             for payload in payloads}
+    users = User.objects.in_bulk({user_id for pair in pairs
+                                  for user_id in pair})
+    # Подписки, отменённые до отправки, пропускаются
+    existing = set(
+        Follow.objects.filter(
+            user_id__in=[user_id for user_id, _ in pairs],
+            author_id__in=[author_id for _, author_id in pairs],
+        ).values_list('user_id', 'author_id')
+    )
+    template = get_template('posts/emails/new_follower.txt')
+    messages = []
+    for user_id, author_id in sorted(pairs & existing):
+        follower, author = users[user_id], users[author_id]
+        if not author.email:
+            continue
+        body = template.render({
+            'author': author,
+            'follower': follower,
+            'profile_url': settings.SITE_URL + reverse(
+                'posts:profile', args=[follower.username]
+            ),
+        })
+        messages.append(EmailMessage('Новый подписчик', body,
+                                     to=[author.email]))
+    tasks.deliver(messages)
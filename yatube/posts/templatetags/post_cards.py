@@ -0,0 +1,75 @@
+from django import template
+from django.urls import reverse
+
+from posts import thumbnails
+
+register = template.Library()
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+class PostCardNode(template.Node):
+    """
+    Карточка поста в ленте. В отличие от {% include %} внутри цикла,
+    шаблон карточки находится один раз на узел (с кэширующим загрузчиком
+    — один раз на процесс), а каждая строка рендерит уже разобранный
+    список узлов без собственного контекста рендеринга. Адреса профиля
+    и группы повторяются на странице и вычисляются один раз за рендер.
+    """
+
+    def __init__(self, post, last):
+        self.post = post
+        self.last = last
+        self.card = None
+
+    def render(self, context):
+        if self.card is None:
+            self.card = context.template.engine.get_template(CARD_TEMPLATE)
+        post = self.post.resolve(context)
+        urls = context.render_context.setdefault(self, {})
+        values = {
+            'post': post,
+            'last': self.last.resolve(context) if self.last else False,
+            'detail_url': reverse('posts:post_detail', args=[post.pk]),
+            'profile_url': self.url(urls, 'posts:profile',
+                                    post.author.username),
+            'group_url': post.group and self.url(urls, 'posts:group_list',
+                                                 post.group.slug),
+        }
+        with context.push(**values):
+            return self.card.nodelist.render(context)
+
+    @staticmethod
+    def url(urls, name, arg):
+        key = (name, arg)
+        if key not in urls:
+            urls[key] = reverse(name, args=[arg])
+        return urls[key]
+
+
+@register.tag
+def post_card(parser, token):
+    """
+    {% post_card post %} или {% post_card post last=forloop.last %}:
+    после последней карточки нет черты.
+    """
+    bits = token.split_contents()
+    if len(bits) not in (2, 3):
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает пост и необязательный last='
+        )
+    last = None
+    if len(bits) == 3:
+        name, _, value = bits[2].partition('=')
+        if name != 'last' or not value:
+            raise template.TemplateSyntaxError(
+                f'{bits[0]}: неизвестный параметр {bits[2]}'
+            )
+        last = parser.compile_filter(value)
+    return PostCardNode(parser.compile_filter(bits[1]), last)
+
+
+@register.simple_tag
+def listing_thumbnail_url(image):
+    """Миниатюра по THUMBNAIL_GEOMETRIES, если thumbnail_url ещё пуст."""
+    return thumbnails.listing_thumbnail_url(image)
@@ -1,8 +1,12 @@
+from unittest import mock
+
 from django.core.cache import cache
-from django.test import TestCase
+from django.test import Client, TestCase
 from django.urls import reverse
 
-from ..models import Group, Post, User
+from core.fragments import get_cache, get_or_render
+
+from ..models import Comment, Follow, Group, Post, User
 
 
 class CacheTest(TestCase):
@@ -16,9 +20,13 @@ class CacheTest(TestCase):
             description='Тестовое описание группы',
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_index_cache(self):
         """
-        Проверка, что созданный пост появляется не сразу на главной странице
+        Проверка, что главная страница кэшируется, а созданный пост
+        появляется на ней сразу
         """
         self.post = Post.objects.create(
             text='Проверка кэша',
@@ -28,13 +36,85 @@ class CacheTest(TestCase):
         response_first = self.client.get(reverse('posts:index'))
         self.assertContains(response_first, self.post.text)
 
+        # update() не отправляет сигналов, поэтому в кэше остаётся
+        # прежний текст
+        Post.objects.filter(pk=self.post.pk).update(text='Изменённый текст')
+        response_second = self.client.get(reverse('posts:index'))
+        self.assertContains(response_second, self.post.text)
+
         self.post_2 = Post.objects.create(
             text='Тест кэша',
             group=self.group,
             author=self.user
         )
-        response_second = self.client.get(reverse('posts:index'))
-        self.assertNotContains(response_second, self.post_2.text)
-        cache.clear()
         response_third = self.client.get(reverse('posts:index'))
         self.assertContains(response_third, self.post_2.text)
+        self.assertContains(response_third, 'Изменённый текст')
+
+    def test_group_and_profile_cache_invalidated(self):
+        """Новый пост сразу появляется в группе и в профиле автора"""
+        urls = (
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for url in urls:
+            self.client.get(url)
+        post = Post.objects.create(
+            text='Новый пост',
+            group=self.group,
+            author=self.user
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), post.text)
+
+    def test_follow_cards_shared_between_users(self):
+        """Карточки ленты подписок кэшируются одни на всех подписчиков"""
+        post = Post.objects.create(text='Пост автора', author=self.user)
+        clients = []
+        for username in ('first', 'second'):
+            follower = User.objects.create(username=username)
+            Follow.objects.create(user=follower, author=self.user)
+            client = Client()
+            client.force_login(follower)
+            clients.append(client)
+        clients[0].get(reverse('posts:follow_index'))
+        Post.objects.filter(pk=post.pk).update(text='Без сигналов')
+        response = clients[1].get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Пост автора')
+        self.assertContains(response, 'second')
+
+        post.text = 'Отредактированный пост'
+        post.save()
+        response = clients[1].get(reverse('posts:follow_index'))
+        self.assertContains(response, post.text)
+
+    def test_post_detail_fragments(self):
+        """
+        Страница поста собирается из общих фрагментов и личных частей:
+        кнопки автора и форма комментария не попадают в кэш
+        """
+        post = Post.objects.create(text='Пост', author=self.user)
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        self.client.get(url)
+        author = Client()
+        author.force_login(self.user)
+        response = author.get(url)
+        self.assertContains(response, 'Редактировать пост')
+        self.assertContains(response, 'Добавить комментарий')
+        self.assertNotContains(self.client.get(url), 'Редактировать пост')
+
+        Comment.objects.create(post=post, author=self.user,
+                               text='Новый комментарий')
+        self.assertContains(self.client.get(url), 'Новый комментарий')
+
+    def test_stale_fragment_served_during_recompute(self):
+        """Пока один запрос пересчитывает фрагмент, другие получают старый"""
+        get_or_render('fragment', 'v1', 60, lambda: 'старый')
+        with mock.patch.object(get_cache(), 'add', return_value=False):
+            content = get_or_render('fragment', 'v2', 60, lambda: 'новый')
+        self.assertEqual(content, 'старый')
+        self.assertEqual(
+            get_or_render('fragment', 'v2', 60, lambda: 'новый'),
+            'новый'
+        )
@@ -0,0 +1,72 @@
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class CommentPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        cls.url = reverse('posts:post_detail',
+                          kwargs={'post_id': cls.post.pk})
+
+    def setUp(self):
+        cache.clear()
+
+    def add_comments(self, count):
+        start = Comment.objects.count()
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.author,
+                    text=f'Комментарий {number}')
+            for number in range(start, start + count)
+        )
+
+    def test_lazy_loading(self):
+        """Страница поста встраивает первую страницу, остальные по ссылке"""
+        self.add_comments(7)
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [comment.text for comment in response.context['comments_page']],
+            ['Комментарий 6', 'Комментарий 5', 'Комментарий 4']
+        )
+        texts, html = [], response.content.decode()
+        while True:
+            match = re.search(r'data-comments-more\s+href="([^"]+)"', html)
+            if match is None:
+                break
+            response = self.client.get(match.group(1).replace('&amp;', '&'))
+            self.assertNotContains(response, '<html')
+            texts.extend(
+                comment.text for comment in response.context['comments_page']
+            )
+            html = response.content.decode()
+        self.assertEqual(texts, [f'Комментарий {number}'
+                                 for number in (3, 2, 1, 0)])
+
+    def test_queries_independent_of_comments(self):
+        """Число запросов страницы поста не зависит от числа комментариев"""
+        counts = []
+        for count in (1, 50):
+            self.add_comments(count)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+            counts.append(len(queries))
+            self.assertEqual(len(response.context['comments_page']),
+                             min(Comment.objects.count(), 3))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_missing_post(self):
+        """Подгрузка комментариев несуществующего поста отдаёт 404"""
+        response = self.client.get(reverse('posts:comments',
+                                           kwargs={'post_id': 999}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug',
+                                         description='Описание')
+        cls.post = Post.objects.create(text='Пост', author=cls.user,
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def urls(self):
+        return (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def test_repeated_visit_not_modified(self):
+        """Повторный запрос с ETag получает 304"""
+        for url in self.urls():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.has_header('Last-Modified'))
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_ignored(self):
+        """После правки и удаления If-Modified-Since не даёт 304"""
+        since = 'Fri, 01 Jan 2100 00:00:00 GMT'
+        post = Post.objects.create(text='Второй пост', author=self.user,
+                                   group=self.group)
+        changes = (
+            lambda: Post.objects.get(pk=self.post.pk).save(),
+            lambda: Post.objects.get(pk=post.pk).delete(),
+        )
+        for change in changes:
+            change()
+            for url in self.urls():
+                with self.subTest(url=url):
+                    response = self.client.get(
+                        url, HTTP_IF_MODIFIED_SINCE=since
+                    )
+                    self.assertEqual(response.status_code, 200)
+
+    def test_changes_reset_etag(self):
+        """Правка поста, комментарий и подписка меняют ETag страниц"""
+        changes = (
+            (self.urls(), lambda: Post.objects.filter(pk=self.post.pk)
+             .first().save()),
+            (self.urls()[3:], lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Комментарий')),
+            (self.urls()[2:3], lambda: Follow.objects.create(
+                user=self.reader, author=self.user)),
+        )
+        for urls, change in changes:
+            etags = {url: self.client.get(url)['ETag'] for url in urls}
+            change()
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=etags[url]
+                    )
+                    self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user_and_page(self):
+        """ETag различается для пользователей и номеров страниц"""
+        url = reverse('posts:index')
+        etag = self.client.get(url)['ETag']
+        reader = Client()
+        reader.force_login(self.reader)
+        self.assertNotEqual(reader.get(url)['ETag'], etag)
+        self.assertNotEqual(self.client.get(url, {'page': 1})['ETag'], etag)
+
+    def test_missing_object_not_found(self):
+        """Для несуществующих объектов по-прежнему отдаётся 404"""
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': 'missing'}),
+            HTTP_IF_NONE_MATCH='*'
+        )
+        self.assertEqual(response.status_code, 404)
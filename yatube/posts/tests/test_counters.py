@@ -0,0 +1,142 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from users.models import Profile
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание группы',
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+
+    def profile(self, user):
+        return Profile.objects.get(user=user)
+
+    def test_post_counters(self):
+        """Создание, смена группы и удаление поста меняют счётчики"""
+        self.author_client.post(reverse('posts:post_create'),
+                                data={'text': 'Пост', 'group': self.group.pk})
+        post = Post.objects.get()
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Пост', 'group': self.other_group.pk}
+        )
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 1)
+
+        self.author_client.get(
+            reverse('posts:post_delete', kwargs={'post_id': post.pk})
+        )
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.profile(self.author).posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 0)
+
+    def test_comment_and_follow_counters(self):
+        """Комментарии и подписки меняют счётчики"""
+        post = Post.objects.create(text='Пост', author=self.author)
+        self.follower_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            data={'text': 'Комментарий'}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+        profile_url = reverse('posts:profile_follow',
+                              kwargs={'username': self.author})
+        self.follower_client.get(profile_url)
+        self.assertEqual(self.profile(self.author).followers_count, 1)
+        self.follower_client.get(reverse('posts:profile_unfollow',
+                                         kwargs={'username': self.author}))
+        self.assertEqual(self.profile(self.author).followers_count, 0)
+
+    def test_pages_use_counters(self):
+        """Страницы показывают счётчики без агрегирующих запросов"""
+        post = Post.objects.create(text='Пост', author=self.author)
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': self.author})
+        )
+        self.assertEqual(response.context['count'], 1)
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertEqual(response.context['author_posts_count'], 1)
+        self.assertEqual(response.context['comments_count'], 0)
+
+    def test_recount_counters_command(self):
+        """Команда пересчитывает счётчики после массовой вставки"""
+        post = Post.objects.create(text='Пост', author=self.author,
+                                   group=self.group)
+        Post.objects.bulk_create(
+            [Post(text='Пост', author=self.author, group=self.group)] * 2
+        )
+        Comment.objects.bulk_create(
+            [Comment(text='Комментарий', author=self.follower, post=post)]
+        )
+        Follow.objects.bulk_create(
+            [Follow(user=self.follower, author=self.author)]
+        )
+        Profile.objects.filter(user=self.follower).delete()
+        call_command('recount_counters', stdout=StringIO())
+        post.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.group.posts_count, 3)
+        self.assertEqual(self.profile(self.author).posts_count, 3)
+        self.assertEqual(self.profile(self.author).followers_count, 1)
+        self.assertTrue(Profile.objects.filter(user=self.follower).exists())
+
+    def test_missing_profile_not_saved_on_read(self):
+        """Страница автора без профиля считает счётчики, не создавая его"""
+        Post.objects.create(text='Пост', author=self.author)
+        Follow.objects.create(user=self.follower, author=self.author)
+        Profile.objects.filter(user=self.author).delete()
+        response = self.follower_client.get(
+            reverse('posts:profile', kwargs={'username': 'author'})
+        )
+        self.assertEqual(
+            (response.context['count'], response.context['count_follower']),
+            (1, 1)
+        )
+        self.assertFalse(Profile.objects.filter(user=self.author).exists())
+
+    def test_fill_profiles_migration(self):
+        """Миграция создаёт профили со счётчиками всем пользователям"""
+        Post.objects.create(text='Пост', author=self.author)
+        Follow.objects.create(user=self.follower, author=self.author)
+        Profile.objects.all().delete()
+        migration = import_module('posts.migrations.0025_fill_profiles')
+        migration.fill_profiles(apps, None)
+        self.assertEqual(Profile.objects.count(), User.objects.count())
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        self.assertEqual(self.profile(self.author).followers_count, 1)
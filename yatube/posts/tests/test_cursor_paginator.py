@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+from ..utils import CursorPaginator
+
+POSTS_COUNT = 25
+
+
+@override_settings(PAGINATION_MODE='cursor')
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        for i in range(POSTS_COUNT):
+            Post.objects.create(author=cls.user, group=cls.group,
+                                text=f'Текст тестового поста {i}')
+        cls.expected = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self):
+        cache.clear()
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+
+    def walk(self, client, url):
+        """Проходит все страницы вперёд и возвращает посты и курсоры"""
+        posts, cursors = [], []
+        response = client.get(url)
+        while True:
+            page_obj = response.context['page_obj']
+            posts.extend(page_obj)
+            if not page_obj.has_next():
+                return posts, cursors
+            cursors.append(page_obj.next_cursor)
+            response = client.get(url, {'cursor': page_obj.next_cursor})
+
+    def test_pages_cover_all_posts(self):
+        """Курсорные страницы перечисляют все посты без повторов"""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                posts, cursors = self.walk(self.follower_client, url)
+                self.assertEqual(posts, self.expected)
+                self.assertEqual(len(cursors),
+                                 POSTS_COUNT // settings.POST_PER_PAGE)
+
+    def test_previous_cursor(self):
+        """Ссылка назад возвращает на предыдущую страницу"""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertFalse(first.has_previous())
+        self.assertEqual(list(paginator.page(second.previous_cursor)),
+                         list(first))
+
+    def test_invalid_cursor_shows_first_page(self):
+        """Повреждённый курсор открывает первую страницу"""
+        response = self.client.get(reverse('posts:index'),
+                                   {'cursor': 'garbage'})
+        self.assertEqual(list(response.context['page_obj']),
+                         self.expected[:settings.POST_PER_PAGE])
+
+    def test_no_count_query(self):
+        """Страница выбирается одним запросом без COUNT и OFFSET"""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        cursor = paginator.page().next_cursor
+        with self.assertNumQueries(1):
+            page = paginator.page(cursor)
+        self.assertEqual(len(page), 10)
@@ -0,0 +1,98 @@
+import csv
+import datetime as dt
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.staff = User.objects.create_user(username='staff',
+                                             is_staff=True)
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='...')
+        cls.old_post = Post.objects.create(text='Старый пост',
+                                           author=cls.author)
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - dt.timedelta(days=10)
+        )
+        cls.post = Post.objects.create(text='Пост, с "кавычками"',
+                                       author=cls.author, group=cls.group)
+        Post.objects.create(text='Чужой пост', author=cls.reader)
+        Comment.objects.create(post=cls.post, author=cls.reader,
+                               text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def export(self, kind, **params):
+        return self.staff_client.get(
+            reverse('posts:export', kwargs={'kind': kind}), params
+        )
+
+    def test_staff_only(self):
+        """Выгрузка доступна только сотрудникам"""
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse('posts:export',
+                                      kwargs={'kind': 'posts'}))
+        self.assertEqual(response.status_code, 302)
+
+    def test_csv_stream_with_filters(self):
+        """CSV отдаётся потоком и учитывает автора и период"""
+        since = timezone.localdate() - dt.timedelta(days=1)
+        response = self.export('posts', author='author', since=since)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row['text'] for row in rows], [self.post.text])
+        self.assertEqual(rows[0]['group'], 'group')
+
+    def test_jsonl(self):
+        """JSON Lines: один объект на строку"""
+        response = self.export('comments', group='group', format='jsonl')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual((row['post'], row['author']),
+                         (self.post.pk, 'reader'))
+
+    def test_bad_filters(self):
+        """Неподдерживаемые фильтры и типы отклоняются"""
+        self.assertEqual(self.export('follows', group='group').status_code,
+                         400)
+        self.assertEqual(self.export('posts', since='вчера').status_code,
+                         400)
+        self.assertEqual(self.export('users').status_code, 404)
+
+    def test_command(self):
+        """Команда пишет выгрузку в файл"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'follows.jsonl')
+            call_command('export_data', 'follows', format='jsonl',
+                         author='author', chunk_size=1, output=path)
+            with open(path, encoding='utf-8') as file:
+                rows = [json.loads(line) for line in file]
+        self.assertEqual(rows, [{'id': Follow.objects.get().pk,
+                                 'user': 'reader', 'author': 'author'}])
+        with self.assertRaises(CommandError):
+            call_command('export_data', 'posts', since='2024-02-30',
+                         stdout=io.StringIO())
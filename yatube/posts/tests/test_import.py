@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from users.models import Profile
+
+from .. import search
+from ..models import Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='...')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def import_posts(self, path, **options):
+        out = StringIO()
+        call_command('import_posts', path, batch_size=2, stdout=out,
+                     **options)
+        return out.getvalue()
+
+    def test_jsonl_with_images(self):
+        """Посты, даты, группы и изображения переносятся из JSON Lines"""
+        self.write('cat.gif', 'GIF89a')
+        rows = [
+            {'author': 'author', 'group': 'group', 'text': 'Первый',
+             'pub_date': '2020-01-02T03:04:05+00:00', 'image': 'cat.gif'},
+            {'author': 'author', 'text': 'Второй'},
+            {'author': 'author', 'text': ''},
+            {'author': 'nobody', 'text': 'Без автора'},
+        ]
+        path = self.write('posts.jsonl',
+                          '\n'.join(json.dumps(row) for row in rows))
+        output = self.import_posts(path, images_dir=self.directory)
+        self.assertIn('Импортировано 2 постов (пропущено 2', output)
+        post = Post.objects.get(text='Первый')
+        self.assertEqual((post.group, post.pub_date.year),
+                         (self.group, 2020))
+        self.assertTrue(post.image.name.startswith('posts/cat'))
+        self.assertTrue(post.image.storage.exists(post.image.name))
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 1)
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_csv_creates_missing(self):
+        """CSV с неизвестными авторами и группами создаёт их"""
+        path = self.write('posts.csv',
+                          'author,group,pub_date,text,image\n'
+                          'newbie,new-group,,Привет,\n'
+                          'newbie,,,Ещё пост,\n'
+                          'author,new-group,,Третий,\n')
+        self.import_posts(path, create_missing=True)
+        newbie = User.objects.get(username='newbie')
+        self.assertFalse(newbie.has_usable_password())
+        self.assertEqual(newbie.posts.count(), 2)
+        self.assertEqual(Group.objects.get(slug='new-group').posts.count(),
+                         2)
+
+    def test_export_round_trip(self):
+        """Выгрузка export_data импортируется обратно"""
+        Post.objects.create(text='Пост, с "кавычками"', author=self.author,
+                            group=self.group)
+        path = os.path.join(self.directory, 'posts.csv')
+        call_command('export_data', 'posts', output=path)
+        Post.objects.all().delete()
+        self.import_posts(path)
+        post = Post.objects.get()
+        self.assertEqual((post.text, post.author, post.group),
+                         ('Пост, с "кавычками"', self.author, self.group))
+
+    def test_broken_file(self):
+        """Битая строка прерывает импорт, предыдущие пачки сохраняются"""
+        path = self.write('posts.jsonl',
+                          '{"author": "author", "text": "1"}\n'
+                          '{"author": "author", "text": "2"}\n'
+                          '{"author": \n')
+        with self.assertRaisesMessage(CommandError, 'Строка 3'):
+            self.import_posts(path)
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_batches_synced(self):
+        """
+        Счётчики, поиск и ленты обновляются для импортированных постов,
+        остальные данные импорт не пересчитывает
+        """
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.author)
+        other = User.objects.create_user(username='other')
+        Profile.objects.create(user=other, posts_count=42)
+        path = self.write('posts.jsonl', '\n'.join(
+            json.dumps({'author': 'author', 'group': 'group',
+                        'text': f'Импортированный {number}',
+                        'pub_date': f'2020-01-0{number + 1}T00:00:00'})
+            for number in range(4)
+        ) + '\n{"author": \n')
+        with self.assertRaises(CommandError):
+            self.import_posts(path)
+        posts = Post.objects.order_by('pub_date')
+        self.assertEqual([post.pub_date.day for post in posts],
+                         [1, 2, 3, 4])
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+        self.assertEqual(Profile.objects.get(user=self.author).posts_count,
+                         4)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 4)
+        self.assertEqual(Profile.objects.get(user=other).posts_count, 42)
+        self.assertEqual(search.get_backend().count('Импортированный'), 4)
+        self.assertCountEqual(
+            TimelineEntry.objects.filter(user=follower)
+            .values_list('post', 'pub_date'),
+            posts.values_list('pk', 'pub_date')
+        )
@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+from users.models import Profile
+
+from .. import notifications
+from ..models import Follow, Notification, Post, User
+
+
+def subscribe(user, mode):
+    Profile.objects.update_or_create(user=user,
+                                     defaults={'post_notifications': mode})
+
+
+@override_settings(TASKS_EAGER=False)
+class NotificationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author',
+                                              first_name='Автор')
+        cls.followers = [
+            User.objects.create_user(username=f'user{number}',
+                                     email=f'user{number}@example.com')
+            for number in range(5)
+        ]
+        for follower in cls.followers:
+            Follow.objects.create(user=follower, author=cls.author)
+        Task.objects.all().delete()
+
+    def setUp(self):
+        cache.clear()
+
+    def run_worker(self):
+        tasks.Worker().run(once=True)
+
+    def test_opt_in(self):
+        """Без подписки на письма уведомления не создаются"""
+        Post.objects.create(text='Пост', author=self.author)
+        self.run_worker()
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_post_create_enqueues_one_job(self):
+        """Создание поста ставит в очередь одну задачу раскладки"""
+        for follower in self.followers:
+            subscribe(follower, Profile.NOTIFY_INSTANT)
+        client = Client()
+        client.force_login(self.author)
+        client.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(
+            Task.objects.filter(name='posts.notify_followers').count(), 1
+        )
+
+    @override_settings(NOTIFICATION_BATCH_SIZE=2)
+    def test_instant(self):
+        """Письма о посте уходят пачками, по соединению на пачку"""
+        for follower in self.followers:
+            subscribe(follower, Profile.NOTIFY_INSTANT)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        with mock.patch('core.tasks.get_connection',
+                        wraps=tasks.get_connection) as get_connection:
+            self.run_worker()
+        self.assertEqual(get_connection.call_count, 3)
+        self.assertCountEqual(
+            [message.to[0] for message in mail.outbox],
+            [follower.email for follower in self.followers]
+        )
+        self.assertIn(reverse('posts:post_detail', args=[post.pk]),
+                      mail.outbox[0].body)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_fanout_idempotent(self):
+        """Повтор раскладки не создаёт второе уведомление"""
+        subscribe(self.followers[0], Profile.NOTIFY_DIGEST)
+        post = Post.objects.create(text='Пост', author=self.author)
+        notifications.fanout(post.pk)
+        notifications.fanout(post.pk)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_digest(self):
+        """Посты интервала приходят одним письмом"""
+        subscribe(self.followers[0], Profile.NOTIFY_DIGEST)
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.followers[0], author=other)
+        for number in range(3):
+            Post.objects.create(text=f'Пост {number}',
+                                author=[self.author, other][number % 2])
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 0)
+        digest = Task.objects.get(name=notifications.DIGEST_TASK)
+        self.assertGreater(digest.run_at, timezone.now())
+        Task.objects.update(run_at=timezone.now())
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 1)
+        for number in range(3):
+            self.assertIn(f'Пост {number}', mail.outbox[0].body)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_running_digest_not_reused(self):
+        """Пока сводку отправляет воркер, ставится следующая"""
+        notifications.send_digests.enqueue(delay=0)
+        tasks.Worker().claim()
+        notifications.schedule_digest()
+        self.assertEqual(
+            Task.objects.filter(name=notifications.DIGEST_TASK).count(), 2
+        )
+
+    def test_settings_page(self):
+        """Пользователь включает письма на странице уведомлений"""
+        client = Client()
+        client.force_login(self.followers[0])
+        url = reverse('users:notifications')
+        self.assertEqual(client.get(url).status_code, 200)
+        client.post(url, {'post_notifications': Profile.NOTIFY_DIGEST})
+        self.assertEqual(
+            Profile.objects.get(user=self.followers[0]).post_notifications,
+            Profile.NOTIFY_DIGEST
+        )
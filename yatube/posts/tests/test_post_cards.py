@@ -0,0 +1,47 @@
+from django.template import Context, Template, TemplateSyntaxError
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class PostCardTagTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='...')
+        cls.posts = [
+            Post.objects.create(text='С группой', author=cls.author,
+                                group=cls.group),
+            Post.objects.create(text='Без группы', author=cls.author),
+        ]
+
+    def render(self, source, **context):
+        return Template('{% load post_cards %}' + source).render(
+            Context(context)
+        )
+
+    def test_cards(self):
+        """Карточки выводят адреса поста, автора и группы"""
+        html = self.render(
+            '{% for post in posts %}'
+            '{% post_card post last=forloop.last %}{% endfor %}',
+            posts=self.posts
+        )
+        self.assertEqual(html.count('<hr>'), 1)
+        self.assertEqual(
+            html.count(reverse('posts:profile', args=['author'])), 2
+        )
+        self.assertEqual(
+            html.count(reverse('posts:group_list', args=['group'])), 1
+        )
+        for post in self.posts:
+            self.assertIn(reverse('posts:post_detail', args=[post.pk]),
+                          html)
+
+    def test_syntax(self):
+        """Неизвестный параметр тега — ошибка разбора шаблона"""
+        with self.assertRaises(TemplateSyntaxError):
+            self.render('{% post_card post first=1 %}')
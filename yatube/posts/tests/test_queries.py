@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class ListingQueriesTest(TestCase):
+    """Число запросов ленты не зависит от числа постов на странице."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.follower = User.objects.create_user(username='follower')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание группы',
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.follower, author=author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.follower)
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                text=f'Пост {i}',
+                author=self.authors[i % len(self.authors)],
+                group=self.group,
+            )
+            Comment.objects.create(post=post, author=self.follower,
+                                   text='Комментарий')
+        return post
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_listing_queries_constant(self):
+        """Ленты и комментарии поста не делают запросов на каждую строку"""
+        post = self.create_posts(1)
+        urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list',
+                             kwargs={'slug': self.group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': self.authors[0]}),
+            'follow': reverse('posts:follow_index'),
+            'detail': reverse('posts:post_detail',
+                              kwargs={'post_id': post.pk}),
+        }
+        before = {name: self.count_queries(url) for name, url in urls.items()}
+        post = self.create_posts(9)
+        Comment.objects.bulk_create([
+            Comment(post=post, author=author, text='Комментарий')
+            for author in self.authors
+        ])
+        for name, url in urls.items():
+            with self.subTest(page=name):
+                self.assertEqual(self.count_queries(url), before[name])
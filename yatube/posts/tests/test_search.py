@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.post_match = Post.objects.create(
+            text='Кошки любят молоко, кошки спят',
+            author=cls.user
+        )
+        cls.post_other = Post.objects.create(
+            text='Собаки любят кости',
+            author=cls.user
+        )
+        cls.post_comment = Post.objects.create(
+            text='Пост без ключевого слова',
+            author=cls.user
+        )
+        Comment.objects.create(post=cls.post_comment, author=cls.user,
+                               text='Здесь тоже про кошку')
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        response = self.client.get(reverse('posts:search'), {'q': query})
+        return list(response.context['page_obj'])
+
+    def test_search_posts_and_comments(self):
+        """Поиск находит посты по тексту поста и комментариев"""
+        self.assertEqual(self.search('кошк'),
+                         [self.post_match, self.post_comment])
+        self.assertEqual(self.search('любят кости'), [self.post_other])
+        self.assertEqual(self.search('КОСТИ'), [self.post_other])
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении записей"""
+        post = Post.objects.get(pk=self.post_other.pk)
+        post.text = 'Собаки любят мячи'
+        post.save()
+        self.assertEqual(self.search('кости'), [])
+        Comment.objects.filter(post=self.post_comment).delete()
+        self.assertEqual(self.search('кошк'), [self.post_match])
+        Post.objects.filter(pk=self.post_match.pk).delete()
+        self.assertEqual(self.search('кошк'), [])
+
+    def test_query_syntax_is_escaped(self):
+        """Служебные символы FTS5 не ломают поиск"""
+        for query in ('"', 'AND OR', 'NEAR(', '*'):
+            with self.subTest(query=query):
+                response = self.client.get(reverse('posts:search'),
+                                           {'q': query})
+                self.assertEqual(response.status_code, 200)
+
+    def test_rebuild(self):
+        """Пересборка индекса учитывает записи, созданные без сигналов"""
+        Post.objects.bulk_create([Post(text='Жирафы', author=self.user)])
+        self.assertEqual(self.search('жирафы'), [])
+        search.get_backend().rebuild()
+        self.assertEqual(len(self.search('жирафы')), 1)
+
+    @override_settings(SEARCH_BACKEND='posts.search.DatabaseSearchBackend')
+    def test_database_backend(self):
+        """Запасной бэкенд для других баз ищет через icontains"""
+        self.assertEqual(set(self.search('кошк')),
+                         {self.post_match, self.post_comment})
+
+    def test_admin_search(self):
+        """Поиск в админке использует полнотекстовый индекс"""
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse('admin:posts_post_changelist'),
+                              {'q': 'кости'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.post_other])
@@ -0,0 +1,79 @@
+from django.core import mail
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import tasks
+from core.models import Task
+
+from ..models import Follow, Post, TimelineEntry, User
+
+
+@override_settings(TASKS_EAGER=False)
+class PostTasksTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com'
+        )
+        cls.follower = User.objects.create_user(username='follower')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.follower)
+
+    def test_timeline_work_deferred(self):
+        """Раскладка по лентам выполняется воркером, а не в запросе"""
+        old_post = Post.objects.create(text='Старый пост', author=self.author)
+        self.client.get(reverse('posts:profile_follow', args=['author']))
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        tasks.Worker().run(once=True)
+        self.assertCountEqual(
+            TimelineEntry.objects.values_list('post', flat=True),
+            [old_post.pk, post.pk]
+        )
+
+    def test_deleted_post_skipped(self):
+        """Пост, удалённый до запуска воркера, не попадает в ленты"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        Post.objects.create(text='Пост', author=self.author).delete()
+        tasks.Worker().run(once=True)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertFalse(Task.objects.exists())
+
+    def test_new_follower_notified(self):
+        """Автор получает письмо о новом подписчике"""
+        self.client.get(reverse('posts:profile_follow', args=['author']))
+        self.assertEqual(len(mail.outbox), 0)
+        tasks.Worker().run(once=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['author@example.com'])
+        self.assertIn('follower', mail.outbox[0].body)
+
+    def test_notifications_batched(self):
+        """Письма пачки собираются двумя запросами к базе"""
+        followers = [User.objects.create_user(username=f'user{number}')
+                     for number in range(5)]
+        for follower in followers:
+            Follow.objects.create(user=follower, author=self.author)
+        payloads = [{'user_id': follower.pk, 'author_id': self.author.pk}
+                    for follower in followers]
+        with self.assertNumQueries(2):
+            tasks.get_handler('posts.notify_new_followers').func(payloads)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_cancelled_follow_not_notified(self):
+        """Подписку отменили до отправки - письма нет"""
+        self.client.get(reverse('posts:profile_follow', args=['author']))
+        self.client.get(reverse('posts:profile_unfollow', args=['author']))
+        tasks.Worker().run(once=True)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_author_without_email(self):
+        """Автору без адреса письмо не отправляется"""
+        Follow.objects.create(user=self.author, author=self.follower)
+        tasks.Worker().run(once=True)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def uploaded_gif(name='small.gif'):
+    return SimpleUploadedFile(name=name, content=SMALL_GIF,
+                              content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_generate_stores_thumbnail_url(self):
+        """Миниатюра строится заранее и выводится без обращения к sorl"""
+        post = Post.objects.create(text='Пост с картинкой', author=self.user,
+                                   image=uploaded_gif())
+        url = thumbnails.generate(post.pk)
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail_url, url)
+        path = os.path.join(TEMP_MEDIA_ROOT,
+                            url[len(settings.MEDIA_URL):])
+        self.assertTrue(os.path.exists(path))
+        with mock.patch.object(thumbnails, 'get_thumbnail') as get_thumbnail:
+            response = self.client.get(reverse('posts:index'))
+        get_thumbnail.assert_not_called()
+        self.assertContains(response, url)
+
+    @override_settings(THUMBNAIL_GEOMETRIES={
+        'card': ('120x40', {'crop': 'center'}),
+    })
+    def test_listing_uses_geometry_setting(self):
+        """Без готовой миниатюры ленты и пост берут размер из настройки"""
+        post = Post.objects.create(text='Пост с картинкой', author=self.user,
+                                   image=uploaded_gif())
+        with mock.patch.object(thumbnails, 'get_thumbnail',
+                               wraps=thumbnails.get_thumbnail) as get:
+            for url in (reverse('posts:index'),
+                        reverse('posts:post_detail', args=[post.pk])):
+                cache.clear()
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(get.call_count, 2)
+        for call in get.call_args_list:
+            self.assertEqual(call[0][1:], ('120x40',))
+            self.assertEqual(call[1], {'crop': 'center'})
+
+    def test_create_and_edit_schedule_generation(self):
+        """Создание поста и смена картинки ставят миниатюры в очередь"""
+        with mock.patch.object(thumbnails, 'schedule') as schedule:
+            self.authorized_client.post(
+                reverse('posts:post_create'),
+                data={'text': 'Пост', 'image': uploaded_gif()}
+            )
+            post = Post.objects.get()
+            self.authorized_client.post(
+                reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+                data={'text': 'Только текст'}
+            )
+            self.authorized_client.post(
+                reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+                data={'text': 'Пост', 'image': uploaded_gif('new.gif')}
+            )
+        self.assertEqual(schedule.call_count, 2)
+
+    def test_backfill_command(self):
+        """Команда строит миниатюры для постов без них"""
+        post = Post.objects.create(text='Пост с картинкой', author=self.user,
+                                   image=uploaded_gif())
+        with mock.patch.object(thumbnails, 'backfill',
+                               side_effect=lambda ids, workers: map(
+                                   thumbnails.generate, ids)):
+            call_command('generate_thumbnails', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url)
@@ -0,0 +1,163 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from users.models import Profile
+
+from .. import timeline
+from ..models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.follower = User.objects.create_user(username='follower')
+        cls.author = User.objects.create_user(username='author')
+        cls.old_post = Post.objects.create(
+            text='Старый пост',
+            author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+
+    def test_follow_backfills_timeline(self):
+        """После подписки старые посты автора попадают в ленту"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.follower, post=self.old_post).exists()
+        )
+
+    def test_new_post_fanned_out(self):
+        """Новый пост раскладывается по лентам подписчиков"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        entry = TimelineEntry.objects.get(user=self.follower, post=post)
+        self.assertEqual(entry.pub_date, post.pub_date)
+        response = self.follower_client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['page_obj'][0], post)
+
+    def test_unfollow_prunes_timeline(self):
+        """После отписки посты автора удаляются из ленты"""
+        follow = Follow.objects.create(user=self.follower, author=self.author)
+        follow.delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.follower).exists()
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_read_on_demand(self):
+        """Посты популярного автора не раскладываются, а читаются из ленты"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(timeline.pull_author_ids(self.follower),
+                         [self.author.pk])
+        response = self.follower_client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']),
+                         [post, self.old_post])
+
+    def feed(self):
+        response = self.follower_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_drops_to_limit(self):
+        """
+        Посты, не разложенные у популярного автора, дописываются в ленты,
+        когда подписчиков снова не больше лимита
+        """
+        Follow.objects.create(user=self.follower, author=self.author)
+        other = Follow.objects.create(
+            user=User.objects.create_user(username='other'),
+            author=self.author
+        )
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed(), [post, self.old_post])
+        other.delete()
+        self.assertEqual(timeline.pull_author_ids(self.follower), [])
+        self.assertEqual(self.feed(), [post, self.old_post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_crosses_limit(self):
+        """
+        Перейдя лимит, автор читается при запросе: записи в лентах
+        удаляются, а лента подписчика не теряет его постов
+        """
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(TimelineEntry.objects.count(), 2)
+        Follow.objects.create(
+            user=User.objects.create_user(username='other'),
+            author=self.author
+        )
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed(), [post, self.old_post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_concurrent_follows_cross_limit(self):
+        """
+        Режим меняется, даже если одновременные подписки и отписки
+        перескочили точное значение лимита
+        """
+        Follow.objects.create(user=self.follower, author=self.author)
+        others = [User.objects.create_user(username=f'other{number}')
+                  for number in range(3)]
+        # Подписки других воркеров, чьи сигналы ещё не отработали
+        Follow.objects.bulk_create(Follow(user=user, author=self.author)
+                                   for user in others[1:])
+        Profile.objects.filter(user=self.author).update(followers_count=3)
+        Follow.objects.create(user=others[0], author=self.author)
+        self.assertFalse(
+            Profile.objects.get(user=self.author).timeline_fanout
+        )
+        self.assertFalse(TimelineEntry.objects.exists())
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        Follow.objects.filter(user__in=others[1:]).delete()
+        Profile.objects.filter(user=self.author).update(followers_count=2)
+        Follow.objects.get(user=others[0]).delete()
+        self.assertTrue(Profile.objects.get(user=self.author).timeline_fanout)
+        self.assertEqual(self.feed(), [post, self.old_post])
+        self.assertEqual(TimelineEntry.objects.count(), 2)
+
+    def test_rebuild_command(self):
+        """
+        Пересборка раскладывает посты по подпискам, кроме постов
+        популярных авторов: их лента читает напрямую
+        """
+        Follow.objects.create(user=self.follower, author=self.author)
+        popular = User.objects.create_user(username='popular')
+        popular_post = Post.objects.create(text='Пост популярного автора',
+                                           author=popular)
+        Follow.objects.create(user=self.follower, author=popular)
+        Follow.objects.create(
+            user=User.objects.create_user(username='other'), author=popular
+        )
+        TimelineEntry.objects.all().delete()
+        with override_settings(TIMELINE_FANOUT_LIMIT=1):
+            call_command('rebuild_timeline', stdout=StringIO())
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user', 'post')),
+            [(self.follower.pk, self.old_post.pk)]
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=popular_post).exists()
+        )
+
+    def test_rebuild_without_profile(self):
+        """Посты автора без профиля попадают в ленты при пересборке"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        Profile.objects.filter(user=self.author).delete()
+        timeline.rebuild()
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user', 'post')),
+            [(self.follower.pk, self.old_post.pk)]
+        )
@@ -0,0 +1,88 @@
+"""
+Фоновая подготовка миниатюр изображений постов.
+
+Миниатюры всех размеров из THUMBNAIL_GEOMETRIES строятся в пуле потоков
+после коммита транзакции, а адрес основной миниатюры сохраняется
+в Post.thumbnail_url, чтобы шаблоны не обращались к sorl при рендеринге.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import get_thumbnail
+
+from .models import Post
+from .utils import bump_listings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails'
+        )
+    return _executor
+
+
+def generate(post_id):
+    """Строит миниатюры поста и сохраняет адрес основной."""
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author_id', 'group_id'
+    ).first()
+    if post is None or not post.image:
+        return None
+    urls = {
+        name: get_thumbnail(post.image, geometry, **options).url
+        for name, (geometry, options) in settings.THUMBNAIL_GEOMETRIES.items()
+    }
+    url = urls[settings.THUMBNAIL_LISTING_GEOMETRY]
+    Post.objects.filter(pk=post_id).update(thumbnail_url=url)
+    bump_listings(post)
+    return url
+
+
+def listing_thumbnail_url(image):
+    """
+    Адрес основной миниатюры (THUMBNAIL_LISTING_GEOMETRY) для поста,
+    у которого фоновая задача её ещё не построила.
+    """
+    geometry, options = settings.THUMBNAIL_GEOMETRIES[
+        settings.THUMBNAIL_LISTING_GEOMETRY
+    ]
+    try:
+        return get_thumbnail(image, geometry, **options).url
+    except Exception:
+        logger.exception('Не удалось построить миниатюру %s', image)
+        return ''
+
+
+def _generate_in_thread(post_id):
+    try:
+        return generate(post_id)
+    except Exception:
+        logger.exception('Не удалось построить миниатюры поста %s', post_id)
+    finally:
+        # Соединения потока пула не закрываются сами
+        connections.close_all()
+
+
+def schedule(post):
+    """Ставит построение миниатюр в очередь после коммита транзакции."""
+    if not post.image:
+        return
+    post_id = post.pk
+    transaction.on_commit(
+        lambda: get_executor().submit(_generate_in_thread, post_id)
+    )
+
+
+def backfill(post_ids, workers):
+    """Параллельно строит миниатюры для набора постов."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_generate_in_thread, post_ids)
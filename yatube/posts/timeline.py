@@ -0,0 +1,233 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, Q, Value, When
+
+from . import counters
+from users.models import Profile
+
+from .models import Follow, Post, TimelineEntry
+from .utils import bulk_create_chunked, cursor_mode
+
+
+def is_enabled():
+    return getattr(settings, 'TIMELINE_ENABLED', False)
+
+
+def is_fanout_author(author):
+    """
+    Раскладываем посты автора по лентам подписчиков, только если
+    подписчиков не больше TIMELINE_FANOUT_LIMIT. Посты популярных
+    авторов читаются при запросе ленты. Режим хранится в профиле и
+    переключается switch_mode.
+    """
+    fanout = (
+        Profile.objects.filter(user=author)
+        .values_list('timeline_fanout', flat=True)
+        .first()
+    )
+    if fanout is None:
+        return (counters.followers_count(author)
+                <= settings.TIMELINE_FANOUT_LIMIT)
+    return fanout
+
+
+def fanout_post(post):
+    """Добавляет пост в ленты всех подписчиков автора."""
+    if not is_fanout_author(post.author):
+        return
+    follower_ids = (
+        Follow.objects.filter(author=post.author)
+        .values_list('user_id', flat=True)
+        .iterator(chunk_size=settings.TIMELINE_BATCH_SIZE)
+    )
+    bulk_create_chunked(
+        TimelineEntry,
+        (
+            TimelineEntry(user_id=user_id, post=post,
+                          author_id=post.author_id, pub_date=post.pub_date)
+            for user_id in follower_ids
+        ),
+        settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_follow(follow):
+    """Добавляет в ленту подписчика уже опубликованные посты автора."""
+    if not is_fanout_author(follow.author):
+        return
+    posts = (
+        Post.objects.filter(author=follow.author)
+        .values_list('pk', 'pub_date')
+        .iterator(chunk_size=settings.TIMELINE_BATCH_SIZE)
+    )
+    bulk_create_chunked(
+        TimelineEntry,
+        (
+            TimelineEntry(user_id=follow.user_id, post_id=post_id,
+                          author_id=follow.author_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ),
+        settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def mode_mismatch(limit):
+    """Профили, у которых режим ленты не совпадает с числом подписчиков."""
+    return (Q(timeline_fanout=True, followers_count__gt=limit)
+            | Q(timeline_fanout=False, followers_count__lte=limit))
+
+
+def switch_mode(author_id):
+    """
+    Переключает режим автора, если счётчик подписчиков перешёл
+    TIMELINE_FANOUT_LIMIT. Проверка и смена флага - один условный
+    UPDATE: сколько бы подписок и отписок ни пришло одновременно, смену
+    увидит ровно один вызов. Возвращает True, если режим сменился.
+    """
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    return bool(
+        Profile.objects.filter(mode_mismatch(limit), user_id=author_id)
+        .update(timeline_fanout=Case(
+            When(followers_count__lte=limit, then=Value(True)),
+            default=Value(False),
+        ))
+    )
+
+
+def sync_author(author):
+    """
+    Приводит ленты подписчиков к текущему режиму автора. Пока автор был
+    популярным, его посты не раскладывались, поэтому при возврате под
+    лимит они дописываются в ленты всех подписчиков. У популярного автора
+    записи в лентах не нужны: его посты читаются при запросе.
+    """
+    if not is_fanout_author(author):
+        TimelineEntry.objects.filter(author=author).delete()
+        return
+    posts = list(
+        Post.objects.filter(author=author).values_list('pk', 'pub_date')
+    )
+    follower_ids = (
+        Follow.objects.filter(author=author)
+        .values_list('user_id', flat=True)
+        .iterator(chunk_size=settings.TIMELINE_BATCH_SIZE)
+    )
+    bulk_create_chunked(
+        TimelineEntry,
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id,
+                          author_id=author.pk, pub_date=pub_date)
+            for user_id in follower_ids
+            for post_id, pub_date in posts
+        ),
+        settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def prune_follow(follow):
+    """Убирает из ленты подписчика посты автора, от которого он отписался."""
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id,
+        author_id=follow.author_id
+    ).delete()
+
+
+def pull_author_ids(user):
+    """Популярные авторы из подписок, чьи посты не раскладываются."""
+    return list(
+        Follow.objects.filter(
+            user=user,
+            author__profile__timeline_fanout=False
+        ).values_list('author_id', flat=True)
+    )
+
+
+def feed_queryset(user, cursor=None):
+    """
+    Лента подписок пользователя. Если среди подписок нет популярных
+    авторов, лента читается одним проходом по индексу (user, -pub_date).
+    cursor выбирает сортировку под курсорную пагинацию, по умолчанию
+    она берётся из настройки PAGINATION_MODE.
+    """
+    if cursor is None:
+        cursor = cursor_mode()
+    pull_ids = pull_author_ids(user)
+    if not pull_ids:
+        queryset = Post.objects.filter(timeline_entries__user=user)
+        if not cursor:
+            # Аннотация в Django 2.2 превращает COUNT(*) пагинатора
+            # в GROUP BY с сортировкой во временном B-дереве
+            return queryset.order_by('-timeline_entries__pub_date')
+        # Курсор фильтрует по ключу отдельным filter(): без аннотации
+        # к записям ленты добавился бы второй JOIN
+        return queryset.annotate(
+            feed_date=F('timeline_entries__pub_date'),
+            feed_post=F('timeline_entries__post'),
+        ).order_by('-feed_date', '-feed_post')
+    entries = TimelineEntry.objects.filter(user=user).values('post')
+    return Post.objects.filter(Q(pk__in=entries) | Q(author__in=pull_ids))
+
+
+def fanout_new_posts(posts):
+    """
+    Раскладка постов, созданных без сигналов (импорт). Подписчики
+    выбираются одним запросом на всех авторов пачки.
+    """
+    by_author = {}
+    for post in posts:
+        by_author.setdefault(post.author_id, []).append(post)
+    author_ids = Profile.objects.filter(
+        user_id__in=by_author,
+        timeline_fanout=True,
+    ).values_list('user_id', flat=True)
+    follows = (
+        Follow.objects.filter(author_id__in=list(author_ids))
+        .values_list('user_id', 'author_id')
+        .iterator(chunk_size=settings.TIMELINE_BATCH_SIZE)
+    )
+    bulk_create_chunked(
+        TimelineEntry,
+        (
+            TimelineEntry(user_id=user_id, post_id=post.pk,
+                          author_id=author_id, pub_date=post.pub_date)
+            for user_id, author_id in follows
+            for post in by_author[author_id]
+        ),
+        settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def rebuild():
+    """
+    Пересобирает ленты всех пользователей по текущим подпискам одним
+    INSERT ... SELECT в одной транзакции: читатели видят старые ленты,
+    пока не закоммичены новые, а ошибка оставляет старые. Режимы авторов
+    пересчитываются по счётчикам, которые должны быть актуальны
+    (recount_counters); автор без профиля раскладывается.
+    """
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    entry = TimelineEntry._meta
+    with transaction.atomic(), connection.cursor() as cursor:
+        Profile.objects.filter(mode_mismatch(limit)).update(
+            timeline_fanout=Case(
+                When(followers_count__lte=limit, then=Value(True)),
+                default=Value(False),
+            )
+        )
+        TimelineEntry.objects.all().delete()
+        cursor.execute(
+            f'INSERT INTO {entry.db_table} '
+            f'(user_id, post_id, author_id, pub_date) '
+            f'SELECT follow.user_id, post.id, post.author_id, post.pub_date '
+            f'FROM {Follow._meta.db_table} follow '
+            f'INNER JOIN {Post._meta.db_table} post '
+            f'ON post.author_id = follow.author_id '
+            f'LEFT JOIN {Profile._meta.db_table} profile '
+            f'ON profile.user_id = follow.author_id '
+            f'WHERE COALESCE(profile.timeline_fanout, %s) = %s',
+            [True, True]
+        )
@@ -9,6 +9,9 @@ urlpatterns = [
     path('group/<slug:slug>/', views.GroupPosts.as_view(), name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='comments'),
+    path('search/', views.post_search, name='search'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
@@ -26,6 +29,7 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('export/<str:kind>/', views.export_data, name='export'),
     path(
         'posts/<int:post_id>/delete/',
         views.post_delete,
@@ -1,12 +1,202 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from itertools import islice
+
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+
+from core.fragments import bump_version, get_version, get_versions
+
+
+def chunked(iterable, size):
+    """Разбивает поток на списки по size элементов."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_create_chunked(model, objs, size, **kwargs):
+    """
+    bulk_create, не собирающий весь поток объектов в память. Размер
+    одного INSERT Django подбирает сам под ограничения базы.
+    """
+    for chunk in chunked(objs, size):
+        model.objects.bulk_create(chunk, **kwargs)
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(Sequence):
+    """
+    Страница курсорной пагинации. Повторяет интерфейс Page, который
+    используется в шаблонах, но не знает номера и общего числа страниц.
+    """
+    number = None
+
+    def __init__(self, object_list, paginator, cursor,
+                 next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page {self.cursor or "first"}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Пагинация по ключу сортировки (pub_date, id) вместо OFFSET.
+    Стоимость любой страницы одинакова: COUNT(*) не выполняется,
+    а следующая страница выбирается условием по значениям ключа.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, per_page):
+        self.per_page = int(per_page)
+        self.ordering = self.get_ordering(object_list)
+        self.object_list = object_list.order_by(*self.ordering)
+
+    @staticmethod
+    def get_ordering(object_list):
+        """
+        Ключ сортировки страниц. Составная сортировка, заданная явно,
+        считается уникальной, к одиночному ключу добавляется id.
+        """
+        ordering = (
+            list(object_list.query.order_by)
+            or list(object_list.model._meta.ordering)
+        )
+        if (len(ordering) < 2
+                and not any(key.lstrip('-') in ('pk', 'id')
+                            for key in ordering)):
+            ordering.append('-pk')
+        return ordering
+
+    @staticmethod
+    def _attr(key):
+        name = key.lstrip('-').split('__')[-1]
+        return 'pk' if name == 'id' else name
+
+    def _values(self, obj):
+        # Строки values() должны содержать поля ключа сортировки
+        if isinstance(obj, dict):
+            return [obj[key.lstrip('-')] for key in self.ordering]
+        return [getattr(obj, self._attr(key)) for key in self.ordering]
+
+    def encode(self, direction, obj):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in self._values(obj)
+        ]
+        raw = json.dumps([direction, values]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(raw)
+        except (binascii.Error, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        if (direction not in ('next', 'prev')
+                or not isinstance(values, list)
+                or len(values) != len(self.ordering)):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _seek(self, values, forward):
+        """Условие "строго после курсора" для лексикографического ключа."""
+        condition = Q()
+        equal = {}
+        for key, value in zip(self.ordering, values):
+            field = key.lstrip('-')
+            descending = key.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def page(self, cursor=None):
+        if not cursor:
+            direction, values = 'next', None
+        else:
+            direction, values = self.decode(cursor)
+        forward = direction == 'next'
+        queryset = self.object_list
+        if values is not None:
+            try:
+                queryset = queryset.filter(self._seek(values, forward))
+            except (ValidationError, ValueError, TypeError):
+                raise InvalidCursor(cursor)
+        if not forward:
+            queryset = queryset.reverse()
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode('next', rows[-1])
+        if rows and has_previous:
+            previous_cursor = self.encode('prev', rows[0])
+        return CursorPage(rows, self, cursor or '', next_cursor,
+                          previous_cursor)
+
+
+def cursor_mode():
+    return getattr(settings, 'PAGINATION_MODE', 'pages') == 'cursor'
+
+
+def cursor_page(request, object_list, per_page):
+    paginator = CursorPaginator(object_list, per_page)
+    try:
+        return paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        # Если курсор повреждён, показываем первую страницу
+        return paginator.page()
 
 
 def func_paginator(request, post_list):
     """
     Функция вывода пагинации
     """
-    paginator = Paginator(post_list, settings.POST_PER_PAGE)
+    if cursor_mode():
+        return cursor_page(request, post_list, settings.POST_PER_PAGE)
+    return numbered_page(request, post_list)
+
+
+def numbered_page(request, object_list):
+    """Страница по номеру ?page= c COUNT и OFFSET."""
+    paginator = Paginator(object_list, settings.POST_PER_PAGE)
     page_number = request.GET.get('page')
     try:
         page_obj = paginator.page(page_number)
@@ -18,3 +208,60 @@ def func_paginator(request, post_list):
         # подставляем последнюю страницу результатов
         page_obj = paginator.page(paginator.num_pages)
     return page_obj
+
+
+class CursorPaginationMixin:
+    """Переключает пагинацию ListView на курсорную по настройке."""
+
+    def paginate_queryset(self, queryset, page_size):
+        if not cursor_mode():
+            return super().paginate_queryset(queryset, page_size)
+        page = cursor_page(self.request, queryset, page_size)
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
+
+def listing_namespace(kind, pk=None):
+    return kind if pk is None else f'{kind}:{pk}'
+
+
+def listing_version(kind, pk=None):
+    """Версия кэша ленты: главной, группы или профиля."""
+    return get_version(listing_namespace(kind, pk))
+
+
+def bump_listings(post, *extra_group_ids):
+    """Сбрасывает кэш всех лент, в которых показывается пост."""
+    group_ids = {post.group_id, *extra_group_ids} - {None}
+    bump_version(
+        listing_namespace('index'),
+        listing_namespace('profile', post.author_id),
+        listing_namespace('post', post.pk),
+        *(listing_namespace('group', pk) for pk in group_ids)
+    )
+
+
+def attach_card_versions(posts):
+    """
+    Проставляет постам версии кэша карточек: карточка общая для всех
+    пользователей и сбрасывается вместе с версией страницы поста.
+    """
+    versions = get_versions(
+        listing_namespace('post', post.pk) for post in posts
+    )
+    for post in posts:
+        post.card_version = versions[listing_namespace('post', post.pk)]
+
+
+def bump_page(kind, pk):
+    """Сбрасывает версию отдельной страницы: поста или профиля автора."""
+    bump_version(listing_namespace(kind, pk))
+
+
+def bump_comments(post_id):
+    """
+    Комментарий меняет страницу поста и comments_count в JSON-лентах.
+    Версия comments общая: HTML-ленты число комментариев не показывают,
+    поэтому их кэш не сбрасывается.
+    """
+    bump_version(listing_namespace('post', post_id),
+                 listing_namespace('comments'))
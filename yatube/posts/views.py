@@ -1,43 +1,67 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import ListView
 from django.conf import settings
 
-from .forms import CommentForm, PostForm
+from . import (conditional, counters, export, search, thumbnails,
+               timeline)
+from .forms import CommentForm, ExportForm, PostForm
 from .models import Comment, Follow, Group, Post, User
-from .utils import func_paginator
+from .utils import (CursorPaginationMixin, CursorPaginator,
+                    attach_card_versions, cursor_page, func_paginator,
+                    listing_version, numbered_page)
 
 
-class PostHome(ListView):
+@method_decorator(conditional.index, name='dispatch')
+class PostHome(CursorPaginationMixin, ListView):
     paginate_by = settings.POST_PER_PAGE
     model = Post
     template_name = 'posts/index.html'
 
     def get_queryset(self):
-        return Post.objects.select_related('author').all()
+        return Post.objects.for_listing()
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['listing_version'] = listing_version('index')
+        return context
 
 
-class GroupPosts(ListView):
+@method_decorator(conditional.group, name='dispatch')
+class GroupPosts(CursorPaginationMixin, ListView):
     paginate_by = settings.POST_PER_PAGE
     model = Post
     template_name = 'posts/group_list.html'
 
     def get_queryset(self):
-        return Post.objects.filter(group__slug=self.kwargs['slug'])
+        return Post.objects.for_listing().filter(
+            group__slug=self.kwargs['slug']
+        )
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['group'] = get_object_or_404(Group, slug=self.kwargs['slug'])
+        group = get_object_or_404(Group, slug=self.kwargs['slug'])
+        context['group'] = group
+        context['listing_version'] = listing_version('group', group.pk)
         return context
 
 
+@conditional.profile
 def profile(request, username: str):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    post_list = Post.objects.filter(author=author)
+    author = get_object_or_404(
+        User.objects.select_related('profile'),
+        username=username
+    )
+    author_profile = counters.get_profile(author)
+    post_list = Post.objects.for_listing().filter(author=author)
     page_obj = func_paginator(request, post_list)
-    count = post_list.count()
-    count_follower = author.following.count()
+    count = author_profile.posts_count
+    count_follower = author_profile.followers_count
     user = request.user
     following = (
         user.is_authenticated
@@ -49,21 +73,67 @@ def profile(request, username: str):
         'author': author,
         'following': following,
         'count_follower': count_follower,
+        'listing_version': listing_version('profile', author.pk),
     }
     return render(request, template, context)
 
 
+def comments_queryset(post_id):
+    """Комментарии поста по индексу (post, -created, -id)."""
+    return Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    ).only('text', 'created', 'author__username')
+
+
+@conditional.post
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    comments = Comment.objects.filter(post=post)
-    comments_count = comments.count()
+    post = get_object_or_404(
+        Post.objects.select_related('author__profile', 'group'),
+        pk=post_id
+    )
+    # Первая страница выбирается, только если фрагмент не в кэше
+    comments_page = SimpleLazyObject(
+        lambda: CursorPaginator(comments_queryset(post.pk),
+                                settings.COMMENTS_PER_PAGE).page()
+    )
     form = CommentForm()
     context = {
-        'comments_count': comments_count,
-        'comments': comments,
+        'comments_count': post.comments_count,
+        'author_posts_count': counters.get_profile(post.author).posts_count,
+        'comments_page': comments_page,
         'post': post,
-        'form': form
+        'form': form,
+        'post_version': listing_version('post', post.pk),
+        'author_version': listing_version('profile', post.author_id),
+    }
+    return render(request, template, context)
+
+
+@conditional.post
+def post_comments(request, post_id):
+    """Следующая страница комментариев для подгрузки на странице поста."""
+    if conditional.post_row(request, post_id) is None:
+        raise Http404
+    context = {
+        'comments_page': cursor_page(request, comments_queryset(post_id),
+                                     settings.COMMENTS_PER_PAGE),
+        'post_id': post_id,
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+def post_search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        # Результаты упорядочены по релевантности, поэтому курсорная
+        # пагинация к ним не применяется
+        page_obj = numbered_page(request, search.SearchResults(query))
+    context = {
+        'page_obj': page_obj,
+        'q': query,
     }
     return render(request, template, context)
 
@@ -78,6 +148,7 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        thumbnails.schedule(post)
         return redirect('posts:profile', username=request.user.username)
     context = {
         'form': form,
@@ -97,7 +168,11 @@ def post_edit(request, post_id):
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
     if form.is_valid():
+        if 'image' in form.changed_data:
+            post.thumbnail_url = ''
         form.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect('posts:post_detail', post_id)
     context = {
         'form': form,
@@ -131,9 +206,15 @@ def add_comment(request, post_id):
 def follow_index(request):
     template = 'posts/follow.html'
     user = request.user
-    user_following = Follow.objects.filter(user=user).values('author')
-    post_list = Post.objects.filter(author__in=user_following)
+    if timeline.is_enabled():
+        post_list = timeline.feed_queryset(user).for_listing()
+    else:
+        user_following = Follow.objects.filter(user=user).values('author')
+        post_list = Post.objects.for_listing().filter(
+            author__in=user_following
+        )
     page_obj = func_paginator(request, post_list)
+    attach_card_versions(page_obj)
     context = {
         'page_obj': page_obj,
     }
@@ -164,3 +245,22 @@ def profile_unfollow(request, username):
     )
     follower.delete()
     return redirect('posts:profile', username=username)
+
+
+@staff_member_required
+def export_data(request, kind):
+    if kind not in export.EXPORTS:
+        raise Http404
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    fmt = form.cleaned_data['format']
+    try:
+        lines = export.stream(kind, fmt, **form.filters())
+    except export.ExportError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(lines, content_type=export.FORMATS[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export.filename(kind, fmt)}"'
+    )
+    return response
@@ -1,5 +1,9 @@
+from django import forms
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+
+from .models import Profile
+from .tasks import send_password_reset
 
 User = get_user_model()
 
@@ -9,3 +13,35 @@ class CreationForm(UserCreationForm):
         model = User
 
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """
+    Письмо отправляет воркер. В очередь ставятся id пользователя и имена
+    шаблонов, ссылку с токеном воркер собирает сам.
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        send_password_reset.enqueue(
+            user_id=context['user'].pk,
+            subject_template_name=subject_template_name,
+            email_template_name=email_template_name,
+            html_email_template_name=html_email_template_name,
+            from_email=from_email,
+            domain=context['domain'],
+            site_name=context['site_name'],
+            protocol=context['protocol'],
+        )
+
+
+class NotificationSettingsForm(forms.ModelForm):
+    class Meta:
+        model = Profile
+        fields = ('post_notifications',)
+        widgets = {
+            'post_notifications': forms.Select(
+                attrs={'class': 'form-control'}
+            )
+        }
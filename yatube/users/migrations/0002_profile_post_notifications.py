@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='post_notifications',
+            field=models.CharField(choices=[('off', 'Не присылать'), ('instant', 'Письмо о каждом посте'), ('digest', 'Сводка новых постов')], default='off', max_length=10, verbose_name='Письма о новых постах подписок'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_timeline_mode(apps, schema_editor):
+    Profile = apps.get_model('users', 'Profile')
+    Profile.objects.filter(
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).update(timeline_fanout=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_profile_post_notifications'),
+        # Профили старых пользователей создаёт posts 0025
+        ('posts', '0025_fill_profiles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='timeline_fanout',
+            field=models.BooleanField(default=True, verbose_name='Раскладка по лентам'),
+        ),
+        migrations.RunPython(fill_timeline_mode, migrations.RunPython.noop),
+    ]
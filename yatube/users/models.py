@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class Profile(models.Model):
+    """
+    Счётчики автора, которые поддерживаются при записи, и настройки
+    писем пользователя.
+    """
+    NOTIFY_OFF = 'off'
+    NOTIFY_INSTANT = 'instant'
+    NOTIFY_DIGEST = 'digest'
+    NOTIFY_CHOICES = [
+        (NOTIFY_OFF, 'Не присылать'),
+        (NOTIFY_INSTANT, 'Письмо о каждом посте'),
+        (NOTIFY_DIGEST, 'Сводка новых постов'),
+    ]
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='profile',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'Число подписчиков',
+        default=0
+    )
+    # Режим ленты подписок: посты автора раскладываются подписчикам или
+    # читаются при запросе, см. posts/timeline.py
+    timeline_fanout = models.BooleanField('Раскладка по лентам',
+                                          default=True)
+    post_notifications = models.CharField(
+        'Письма о новых постах подписок',
+        max_length=10,
+        choices=NOTIFY_CHOICES,
+        default=NOTIFY_OFF
+    )
+
+    class Meta:
+        verbose_name = 'Профиль'
+        verbose_name_plural = 'Профили'
+
+    def __str__(self):
+        return str(self.user)
@@ -0,0 +1,52 @@
+"""
+Фоновые задачи пользователей. Письмо сброса пароля собирается воркером:
+в очереди лежат только id пользователя и имена шаблонов, а ссылка
+с токеном в базу не попадает.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMultiAlternatives
+from django.template import loader
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from core import tasks
+
+User = get_user_model()
+
+
+@tasks.task('users.send_password_reset', batch=True)
+def send_password_reset(payloads):
+    users = User.objects.in_bulk({payload['user_id']
+                                  for payload in payloads})
+    messages = []
+    for payload in payloads:
+        user = users.get(payload['user_id'])
+        # Пользователя могли удалить или отключить, пока задача ждала
+        if user is None or not user.is_active:
+            continue
+        context = {
+            'email': user.email,
+            'user': user,
+            'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+            'token': default_token_generator.make_token(user),
+            'domain': payload['domain'],
+            'site_name': payload['site_name'],
+            'protocol': payload['protocol'],
+        }
+        subject = loader.render_to_string(payload['subject_template_name'],
+                                          context)
+        message = EmailMultiAlternatives(
+            ''.join(subject.splitlines()),
+            loader.render_to_string(payload['email_template_name'],
+                                    context),
+            payload['from_email'], [user.email],
+        )
+        if payload['html_email_template_name']:
+            message.attach_alternative(
+                loader.render_to_string(payload['html_email_template_name'],
+                                        context),
+                'text/html'
+            )
+        messages.append(message)
+    tasks.deliver(messages)
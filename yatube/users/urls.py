@@ -5,6 +5,7 @@ from django.contrib.auth.views import (
 from django.urls import path
 
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -21,6 +22,10 @@ urlpatterns = [
          LoginView.as_view(template_name='users/login.html'),
          name='login'
          ),
+    path('notifications/',
+         views.NotificationSettings.as_view(),
+         name='notifications'
+         ),
     path(
         'password_change/',
         PasswordChangeView.as_view(
@@ -38,7 +43,8 @@ urlpatterns = [
     path(
         'password_reset/',
         PasswordResetView.as_view(
-            template_name='users/password_reset_form.html'
+            template_name='users/password_reset_form.html',
+            form_class=QueuedPasswordResetForm
         ),
         name='password_reset_form'
     ),
@@ -1,10 +1,23 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
-from django.views.generic import CreateView
+from django.views.generic import CreateView, UpdateView
 
-from .forms import CreationForm
+from .forms import CreationForm, NotificationSettingsForm
+from .models import Profile
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+class NotificationSettings(LoginRequiredMixin, UpdateView):
+    """Подписка на письма о новых постах авторов из подписок."""
+    form_class = NotificationSettingsForm
+    success_url = reverse_lazy('users:notifications')
+    template_name = 'users/notifications.html'
+
+    def get_object(self, queryset=None):
+        # Профиль создаётся счётчиками при первом посте или подписке
+        return Profile.objects.get_or_create(user=self.request.user)[0]
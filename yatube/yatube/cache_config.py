@@ -0,0 +1,63 @@
+"""
+Настройка CACHES по адресу хранилища из окружения.
+
+    locmem://                     память процесса (по умолчанию)
+    file:///var/tmp/yatube        файлы, общие для всех воркеров
+    db://yatube_cache             таблица в базе (manage.py createcachetable)
+    memcached://127.0.0.1:11211   memcached, нужен пакет python-memcached
+    dummy://                      без кэша
+
+Каждый алиас получает свой KEY_PREFIX, а общая VERSION позволяет
+сбросить весь кэш при выкладке.
+"""
+import os
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+ALIASES = ('default', 'fragments', 'sessions', 'thumbnails')
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def location(url, alias):
+    parts = urlsplit(url)
+    if parts.scheme == 'locmem':
+        # Алиасы разделены префиксом, а хранилище у процесса одно:
+        # cache.clear() сбрасывает всё, как и раньше
+        return 'yatube'
+    if parts.scheme == 'file':
+        if not parts.path:
+            raise ImproperlyConfigured(f'Не указан каталог кэша: {url}')
+        return os.path.join(parts.path, alias)
+    if parts.scheme == 'db':
+        return parts.netloc or 'yatube_cache'
+    if parts.scheme == 'memcached':
+        return parts.netloc.split(',')
+    return ''
+
+
+def cache_settings(url, key_prefix='yatube', version=1, max_entries=10000,
+                   aliases=ALIASES):
+    scheme = urlsplit(url).scheme
+    if scheme not in BACKENDS:
+        raise ImproperlyConfigured(f'Неизвестное хранилище кэша: {url}')
+    return {
+        alias: {
+            'BACKEND': BACKENDS[scheme],
+            'LOCATION': location(url, alias),
+            'KEY_PREFIX': f'{key_prefix}:{alias}',
+            'VERSION': version,
+            'OPTIONS': (
+                {} if scheme == 'memcached'
+                else {'MAX_ENTRIES': max_entries}
+            ),
+        }
+        for alias in aliases
+    }
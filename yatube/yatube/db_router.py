@@ -0,0 +1,95 @@
+"""
+Чтение постов, групп, комментариев и подписок с реплик.
+
+Реплики перечислены в REPLICA_DATABASES. Записи всегда идут в основную
+базу, а сессия, которая только что писала, ещё REPLICA_PIN_SECONDS
+читает тоже из основной базы (метка в cookie), чтобы сразу увидеть свои
+изменения, например новый пост в профиле после post_create.
+
+Вне HTTP-запросов (команды, фоновые потоки) всё читается из основной
+базы: там важнее согласованность, чем разгрузка.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICATED_APPS = {'posts'}
+PIN_COOKIE = 'db_primary'
+
+
+class RequestState:
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('replica_state', default=None)
+
+
+@contextmanager
+def primary():
+    """Все чтения внутри блока идут в основную базу."""
+    token = _state.set(RequestState(pinned=True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def pinned_to_primary():
+    """Текущий запрос читает основную базу, хотя реплики настроены."""
+    state = _state.get()
+    return bool(settings.REPLICA_DATABASES and state and state.pinned)
+
+
+class ReplicaRouter:
+    def _replicated(self, model):
+        return model._meta.app_label in REPLICATED_APPS
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        state = _state.get()
+        if (not replicas or state is None or state.pinned
+                or not self._replicated(model)):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if not self._replicated(model):
+            return None
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        # Объект, прочитанный с реплики, сохраняется в основную базу
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет за сессией основную базу после записи."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and settings.REPLICA_DATABASES:
+            response.set_cookie(PIN_COOKIE, '1',
+                                max_age=settings.REPLICA_PIN_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,11 @@
+"""
+Настройки выбираются переменной окружения YATUBE_ENV: development
+(по умолчанию) загружает yatube.settings.dev, production -
+yatube.settings.prod. DJANGO_SETTINGS_MODULE может указать модуль напрямую.
+"""
+import os
+
+if os.getenv('YATUBE_ENV', 'development') == 'production':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
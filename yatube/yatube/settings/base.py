@@ -0,0 +1,268 @@
+"""
+Общие настройки всех окружений, см. yatube/settings/__init__.py.
+"""
+import os
+from copy import deepcopy
+
+from ..cache_config import cache_settings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+)))
+
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+
+SECRET_KEY = os.getenv('SECRET_KEY')
+
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv(
+    'ALLOWED_HOSTS', '.localhost,127.0.0.1,[::1],testserver'
+).split(',')
+
+# Application definition
+
+INSTALLED_APPS = [
+    'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'core.apps.CoreConfig',
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.PerformanceMetricsMiddleware',
+    'yatube.db_router.ReplicaPinMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'core.template_backend.InstrumentedDjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+# Задаётся в yatube.settings.dev и yatube.settings.prod, см. cached_templates
+TEMPLATE_CACHE = False
+
+
+def cached_templates(templates):
+    """
+    Режим шаблонов продакшена: скомпилированные шаблоны хранятся в памяти
+    и компилируются все при старте воркера (yatube/wsgi.py). Изменения
+    шаблонов на диске подхватываются только после перезапуска.
+    """
+    templates = deepcopy(templates)
+    templates[0]['APP_DIRS'] = False
+    templates[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    return templates
+
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+# Постоянные соединения: PRAGMA ниже применяются раз на соединение
+CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+    }
+}
+
+# Настройка SQLite для каждого нового соединения, см. core/signals.py.
+# WAL позволяет читать во время записи, а busy_timeout заставляет писателя
+# ждать блокировку, а не падать с "database is locked".
+# SQLITE_TUNING=0 оставляет значения SQLite по умолчанию.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 10000,
+} if os.getenv('SQLITE_TUNING', '1') == '1' else {}
+
+# Реплики для чтения: файлы SQLite через запятую, которые синхронизирует
+# с основной базой внешний инструмент. Чтение моделей posts идёт туда,
+# см. yatube/db_router.py.
+for number, name in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'TEST': {'MIRROR': 'default'},
+    }
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['yatube.db_router.ReplicaRouter']
+# Столько секунд после записи сессия читает из основной базы
+REPLICA_PIN_SECONDS = 10
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+LOGOUT_URL = 'users:logout'
+
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# указываем директорию, в которую будут складываться файлы писем
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Фоновая очередь задач, см. core/tasks.py и `manage.py run_tasks`.
+# С TASKS_EAGER задачи выполняются сразу в запросе.
+TASKS_EAGER = os.getenv('TASKS_EAGER', '0') == '1'
+TASK_BATCH_SIZE = 100
+TASK_MAX_ATTEMPTS = 5
+# Повтор через 30 с, 60 с, 120 с, ...
+TASK_RETRY_DELAY = 30
+# Через столько секунд задачу упавшего воркера берёт другой
+TASK_LEASE_SECONDS = 300
+TASK_POLL_INTERVAL = 1.0
+
+# Письма о новых постах подписчикам, которые их включили, см.
+# posts/notifications.py. Подписчики читаются и уведомления пишутся
+# пачками такого размера.
+NOTIFICATION_BATCH_SIZE = 1000
+# Режим сводки: посты за столько секунд приходят одним письмом
+NOTIFICATION_DIGEST_INTERVAL = 3600
+NOTIFICATION_DIGEST_POSTS = 10
+# Абсолютные ссылки в письмах
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+
+# Constant count posts per page
+POST_PER_PAGE = 10
+# Комментарии на странице поста, остальные подгружаются по курсору
+COMMENTS_PER_PAGE = 20
+# 'pages' - нумерованные страницы с COUNT/OFFSET, 'cursor' - по ключу
+PAGINATION_MODE = os.getenv('PAGINATION_MODE', 'pages')
+# Страницы JSON API всегда курсорные, ?limit= ограничен этим числом
+API_MAX_PAGE_SIZE = 100
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Хранилище кэша выбирается CACHE_URL, см. yatube/cache_config.py.
+# С несколькими воркерами нужно общее хранилище (file://, db:// или
+# memcached://); CACHE_VERSION при деплое начинает с пустого кэша.
+CACHES = cache_settings(
+    os.getenv('CACHE_URL', 'locmem://'),
+    key_prefix=os.getenv('CACHE_KEY_PREFIX', 'yatube'),
+    version=int(os.getenv('CACHE_VERSION', '1')),
+    max_entries=int(os.getenv('CACHE_MAX_ENTRIES', '10000')),
+)
+FRAGMENT_CACHE_ALIAS = 'fragments'
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+THUMBNAIL_CACHE = 'thumbnails'
+
+# Материализованная лента подписок: посты раскладываются подписчикам
+# при записи. Авторы с числом подписчиков больше лимита читаются при запросе.
+TIMELINE_ENABLED = True
+TIMELINE_FANOUT_LIMIT = 5000
+TIMELINE_BATCH_SIZE = 1000
+
+# Версионный кэш фрагментов: устаревший фрагмент перерисовывает один
+# запрос под блокировкой, остальные пока отдают прежнее содержимое.
+FRAGMENT_LOCK_TIMEOUT = 10
+FRAGMENT_STALE_TIMEOUT = 300
+
+# Метрики запросов по именам view в каждом процессе, см. /metrics/
+PERFORMANCE_METRICS_SAMPLES = 1000
+
+# Миниатюры строятся заранее в фоновом пуле потоков после загрузки
+THUMBNAIL_GEOMETRIES = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+THUMBNAIL_LISTING_GEOMETRY = 'card'
+THUMBNAIL_WORKERS = 2
+
+# Полнотекстовый поиск: SQLite FTS5 по умолчанию, icontains для других баз.
+# SEARCH_BACKEND может указывать на наследника posts.search.BaseSearchBackend.
+SEARCH_BACKEND = None
+SEARCH_ADMIN_LIMIT = 1000
+
+# Условный GET: ETag строится из версий кэша, которые меняют сигналы.
+# Соль меняется при деплое, чтобы клиенты получили новые шаблоны.
+ETAG_SALT = os.getenv('ETAG_SALT', '')
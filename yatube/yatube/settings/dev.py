@@ -0,0 +1,33 @@
+"""
+Локальная разработка: DEBUG, debug_toolbar и переменные из .env.
+С DEBUG каждый SQL-запрос пишется в connection.queries, поэтому
+воркеры с этими настройками не запускаются.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from .base import *  # noqa: E402,F401,F403
+from .base import (  # noqa: E402
+    INSTALLED_APPS, MIDDLEWARE, TEMPLATES, cached_templates,
+)
+
+DEBUG = True
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+# Задачи выполняются в запросе, если не задано TASKS_EAGER=0 и не запущен
+# `run_tasks`
+TASKS_EAGER = os.getenv('TASKS_EAGER', '1') == '1'
+
+# Шаблоны перечитываются с диска, если не задано TEMPLATE_CACHE=1
+TEMPLATE_CACHE = os.getenv('TEMPLATE_CACHE', '0') == '1'
+if TEMPLATE_CACHE:
+    TEMPLATES = cached_templates(TEMPLATES)
@@ -0,0 +1,36 @@
+"""
+Воркеры за gunicorn: без DEBUG, debug_toolbar и .env, все переменные
+задаёт менеджер процессов. Время старта воркера измеряет
+`manage.py startup_profile --env YATUBE_ENV=production`.
+"""
+import os
+from copy import deepcopy
+
+from .base import *  # noqa: F401,F403
+from .base import TEMPLATES, cached_templates
+
+DEBUG = False
+
+# Security и Common отвечают редиректами на HTTPS и APPEND_SLASH и
+# отклоняют чужие хосты до загрузки сессии, привязки к реплике и
+# пользователя. Middleware метрик остаётся внешним, чтобы мерить всё.
+MIDDLEWARE = [
+    'core.middleware.PerformanceMetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'yatube.db_router.ReplicaPinMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Контекст-процессор debug работает только с DEBUG
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+    'django.template.context_processors.debug'
+)
+TEMPLATE_CACHE = os.getenv('TEMPLATE_CACHE', '1') == '1'
+if TEMPLATE_CACHE:
+    TEMPLATES = cached_templates(TEMPLATES)
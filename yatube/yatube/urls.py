@@ -9,15 +9,20 @@ urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('metrics/', include('core.urls', namespace='core')),
+    path('api/v1/', include('api.urls', namespace='api')),
 ]
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.error_500'
 handler403 = 'core.views.csrf_failure'
 
 if settings.DEBUG:
-    import debug_toolbar
-
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
+
+# Only yatube.settings.dev installs the toolbar
+if 'debug_toolbar' in settings.INSTALLED_APPS:
+    import debug_toolbar
+
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)